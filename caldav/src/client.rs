@@ -13,6 +13,7 @@ use jiff::civil::DateTime;
 use quick_xml::Writer;
 use quick_xml::events::{BytesEnd, BytesStart, BytesText, Event};
 use reqwest::Method;
+use reqwest::header::{CONTENT_TYPE, HeaderValue};
 
 use crate::config::CalDavConfig;
 use crate::error::CalDavError;
@@ -63,7 +64,7 @@ impl CalDavClient {
     ///
     /// Returns an error if HTTP client initialization fails.
     pub fn new(config: CalDavConfig) -> Result<Self, CalDavError> {
-        let http = HttpClient::new(config.clone())?;
+        let http = HttpClient::new(&config)?;
         Ok(Self {
             http: Arc::new(http),
             config,
@@ -129,12 +130,8 @@ impl CalDavClient {
             .http
             .execute(
                 self.http
-                    .build_request(
-                        Method::from_bytes(b"PROPFIND")
-                            .map_err(|e| CalDavError::Http(format!("Invalid method: {e}")))?,
-                        &url,
-                    )
-                    .header("Content-Type", "application/xml; charset=utf-8")
+                    .build_request(dav_method(b"PROPFIND"), &url)
+                    .header(CONTENT_TYPE, XML_CONTENT_TYPE.clone())
                     .body(xml_body),
             )
             .await?;
@@ -221,12 +218,8 @@ impl CalDavClient {
             .http
             .execute(
                 self.http
-                    .build_request(
-                        Method::from_bytes(b"MKCALENDAR")
-                            .map_err(|e| CalDavError::Http(format!("Invalid method: {e}")))?,
-                        &url,
-                    )
-                    .header("Content-Type", "application/xml; charset=utf-8")
+                    .build_request(dav_method(b"MKCALENDAR"), &url)
+                    .header(CONTENT_TYPE, XML_CONTENT_TYPE.clone())
                     .body(body),
             )
             .await?;
@@ -289,7 +282,7 @@ impl CalDavClient {
             .execute(
                 self.http
                     .build_request(Method::PUT, &url)
-                    .header("Content-Type", "text/calendar; charset=utf-8")
+                    .header(CONTENT_TYPE, CALENDAR_CONTENT_TYPE.clone())
                     .body(ical_data),
             )
             .await?;
@@ -332,7 +325,7 @@ impl CalDavClient {
             .execute(HttpClient::if_match(
                 self.http
                     .build_request(Method::PUT, &url)
-                    .header("Content-Type", "text/calendar; charset=utf-8")
+                    .header(CONTENT_TYPE, CALENDAR_CONTENT_TYPE.clone())
                     .body(ical_data),
                 etag,
             ))
@@ -411,12 +404,8 @@ impl CalDavClient {
             .http
             .execute(
                 self.http
-                    .build_request(
-                        Method::from_bytes(b"REPORT")
-                            .map_err(|e| CalDavError::Http(format!("Invalid method: {e}")))?,
-                        &url,
-                    )
-                    .header("Content-Type", "application/xml; charset=utf-8")
+                    .build_request(dav_method(b"REPORT"), &url)
+                    .header(CONTENT_TYPE, XML_CONTENT_TYPE.clone())
                     .body(xml_body),
             )
             .await?;
@@ -457,12 +446,8 @@ impl CalDavClient {
             .http
             .execute(
                 self.http
-                    .build_request(
-                        Method::from_bytes(b"REPORT")
-                            .map_err(|e| CalDavError::Http(format!("Invalid method: {e}")))?,
-                        &url,
-                    )
-                    .header("Content-Type", "application/xml; charset=utf-8")
+                    .build_request(dav_method(b"REPORT"), &url)
+                    .header(CONTENT_TYPE, XML_CONTENT_TYPE.clone())
                     .body(xml_body),
             )
             .await?;
@@ -618,12 +603,8 @@ impl CalDavClient {
             .http
             .execute(
                 self.http
-                    .build_request(
-                        Method::from_bytes(b"REPORT")
-                            .map_err(|e| CalDavError::Http(format!("Invalid method: {e}")))?,
-                        &url,
-                    )
-                    .header("Content-Type", "application/xml; charset=utf-8")
+                    .build_request(dav_method(b"REPORT"), &url)
+                    .header(CONTENT_TYPE, XML_CONTENT_TYPE.clone())
                     .body(xml_body),
             )
             .await?;
@@ -657,12 +638,8 @@ impl CalDavClient {
             .http
             .execute(
                 self.http
-                    .build_request(
-                        Method::from_bytes(b"PROPFIND")
-                            .map_err(|e| CalDavError::Http(format!("Invalid method: {e}")))?,
-                        &url,
-                    )
-                    .header("Content-Type", "application/xml; charset=utf-8")
+                    .build_request(dav_method(b"PROPFIND"), &url)
+                    .header(CONTENT_TYPE, XML_CONTENT_TYPE.clone())
                     .body(xml_body)
                     .header("Depth", "1"),
             )
@@ -692,6 +669,20 @@ impl CalDavClient {
     }
 }
 
+/// `Content-Type` for `WebDAV`/`CalDAV` XML request bodies.
+static XML_CONTENT_TYPE: HeaderValue = HeaderValue::from_static("application/xml; charset=utf-8");
+
+/// `Content-Type` for iCalendar request bodies.
+static CALENDAR_CONTENT_TYPE: HeaderValue =
+    HeaderValue::from_static("text/calendar; charset=utf-8");
+
+/// Returns a `WebDAV`/`CalDAV` extension method such as `PROPFIND`.
+///
+/// Method names this short are stored inline, so parsing is cheap and allocation-free.
+fn dav_method(name: &'static [u8]) -> Method {
+    Method::from_bytes(name).expect("valid HTTP method")
+}
+
 /// Result of `CalDAV` server discovery.
 #[derive(Debug, Clone)]
 pub struct DiscoverResult {
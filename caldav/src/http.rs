@@ -4,6 +4,9 @@
 
 //! HTTP client wrapper with authentication and `ETag` handling.
 
+use base64::Engine;
+use base64::engine::general_purpose::STANDARD;
+use reqwest::header::{AUTHORIZATION, HeaderMap, HeaderValue};
 use reqwest::{Client, Method, RequestBuilder, Response, StatusCode};
 
 use crate::config::{AuthMethod, CalDavConfig};
@@ -14,7 +17,6 @@ use crate::types::ETag;
 #[derive(Debug)]
 pub struct HttpClient {
     client: Client,
-    config: CalDavConfig,
 }
 
 impl HttpClient {
@@ -23,27 +25,25 @@ impl HttpClient {
     /// # Errors
     ///
     /// Returns an error if HTTP client creation fails.
-    pub fn new(config: CalDavConfig) -> Result<Self, CalDavError> {
+    pub fn new(config: &CalDavConfig) -> Result<Self, CalDavError> {
+        // The credentials never change for a client, so encode the header once and
+        // let reqwest attach it to every request.
+        let mut headers = HeaderMap::new();
+        if let Some(auth) = auth_header(&config.auth)? {
+            headers.insert(AUTHORIZATION, auth);
+        }
+
         let client = Client::builder()
             .timeout(std::time::Duration::from_secs(config.timeout_secs))
             .user_agent(&config.user_agent)
+            .default_headers(headers)
             .build()?;
-        Ok(Self { client, config })
+        Ok(Self { client })
     }
 
     /// Builds a request with authentication headers.
     pub fn build_request(&self, method: Method, url: &str) -> RequestBuilder {
-        let mut req = self.client.request(method, url);
-
-        match &self.config.auth {
-            AuthMethod::Basic { username, password } => {
-                req = req.basic_auth(username, Some(password));
-            }
-            AuthMethod::Bearer { token } => req = req.bearer_auth(token),
-            AuthMethod::None => {}
-        }
-
-        req
+        self.client.request(method, url)
     }
 
     /// Executes a request and checks for HTTP errors.
@@ -100,3 +100,81 @@ impl HttpClient {
             .ok_or_else(|| CalDavError::Http("Missing ETag header".to_string()))
     }
 }
+
+/// Encodes the `Authorization` header value for the given authentication method.
+fn auth_header(auth: &AuthMethod) -> Result<Option<HeaderValue>, CalDavError> {
+    let value = match auth {
+        AuthMethod::None => return Ok(None),
+        AuthMethod::Basic { username, password } => {
+            format!(
+                "Basic {}",
+                STANDARD.encode(format!("{username}:{password}"))
+            )
+        }
+        AuthMethod::Bearer { token } => format!("Bearer {token}"),
+    };
+
+    let mut header = HeaderValue::from_str(&value)
+        .map_err(|e| CalDavError::Config(format!("Invalid authorization header: {e}")))?;
+    header.set_sensitive(true);
+    Ok(Some(header))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn auth_header_none_returns_none() {
+        // Act
+        let header = auth_header(&AuthMethod::None).unwrap();
+
+        // Assert
+        assert!(header.is_none());
+    }
+
+    #[test]
+    fn auth_header_basic_encodes_credentials() {
+        // Arrange
+        let auth = AuthMethod::Basic {
+            username: "user".to_string(),
+            password: "pass".to_string(),
+        };
+
+        // Act
+        let header = auth_header(&auth).unwrap().unwrap();
+
+        // Assert
+        assert_eq!(header, "Basic dXNlcjpwYXNz");
+        assert!(header.is_sensitive());
+    }
+
+    #[test]
+    fn auth_header_bearer_uses_token() {
+        // Arrange
+        let auth = AuthMethod::Bearer {
+            token: "abc123".to_string(),
+        };
+
+        // Act
+        let header = auth_header(&auth).unwrap().unwrap();
+
+        // Assert
+        assert_eq!(header, "Bearer abc123");
+        assert!(header.is_sensitive());
+    }
+
+    #[test]
+    fn auth_header_rejects_invalid_characters() {
+        // Arrange
+        let auth = AuthMethod::Bearer {
+            token: "bad\ntoken".to_string(),
+        };
+
+        // Act
+        let result = auth_header(&auth);
+
+        // Assert
+        assert!(matches!(result, Err(CalDavError::Config(_))));
+    }
+}
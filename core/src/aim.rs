@@ -2,10 +2,12 @@
 //
 // SPDX-License-Identifier: Apache-2.0
 
-use std::collections::{HashMap, HashSet};
+use std::collections::HashMap;
+use std::collections::hash_map::Entry;
 use std::error::Error;
 use std::fmt;
 
+use aimcal_caldav::CalDavClient;
 use jiff::Zoned;
 use tokio::fs;
 use uuid::Uuid;
@@ -130,12 +132,16 @@ impl Aim {
     }
 
     /// Create a store from a store definition and calendar-specific fields.
+    ///
+    /// `CalDAV` clients are cached in `clients` by store name, so calendars of the same store
+    /// share one HTTP connection pool and discovered server capabilities.
     fn create_store(
         calendar_id: String,
         entry: &crate::CalendarEntry,
         store_def: &StoreDef,
         db: &Db,
         state_dir: Option<&std::path::Path>,
+        clients: &mut HashMap<String, CalDavClient>,
     ) -> Result<Box<dyn Store>, Box<dyn Error>> {
         match store_def {
             StoreDef::Local { .. } => {
@@ -166,20 +172,27 @@ impl Aim {
                         "Calendar '{calendar_id}' references caldav store but has no calendar_href"
                     )
                 })?;
-                let caldav_config = aimcal_caldav::CalDavConfig {
-                    base_url: base_url.clone(),
-                    calendar_home: calendar_home.clone(),
-                    auth: auth.clone(),
-                    timeout_secs: *timeout_secs,
-                    user_agent: user_agent.clone(),
+                let client = match clients.entry(entry.store.clone()) {
+                    Entry::Occupied(e) => e.get().clone(),
+                    Entry::Vacant(e) => {
+                        let caldav_config = aimcal_caldav::CalDavConfig {
+                            base_url: base_url.clone(),
+                            calendar_home: calendar_home.clone(),
+                            auth: auth.clone(),
+                            timeout_secs: *timeout_secs,
+                            user_agent: user_agent.clone(),
+                        };
+                        let client = CalDavClient::new(caldav_config)
+                            .map_err(|e| format!("Failed to create CalDAV store: {e}"))?;
+                        e.insert(client).clone()
+                    }
                 };
-                let backend = CaldavStore::new(
-                    caldav_config,
+                let backend = CaldavStore::with_client(
+                    client,
                     calendar_href.to_string(),
                     db.clone(),
                     calendar_id,
-                )
-                .map_err(|e| format!("Failed to create CalDAV store: {e}"))?;
+                );
                 Ok(Box::new(backend))
             }
         }
@@ -213,9 +226,9 @@ impl Aim {
             default_calendar,
             startup_notices,
         } = if config.is_legacy_format() {
-            Self::initialize_legacy_calendar(&config, &db).await?
+            Self::initialize_legacy_calendar(&config, &db, &now).await?
         } else {
-            Self::initialize_multi_calendars(&config, &db).await?
+            Self::initialize_multi_calendars(&config, &db, &now).await?
         };
 
         // Sync all stores with local cache
@@ -239,6 +252,7 @@ impl Aim {
     async fn initialize_legacy_calendar(
         config: &Config,
         db: &Db,
+        now: &Zoned,
     ) -> Result<InitializedStores, Box<dyn Error>> {
         let default_calendar_id = "default".to_string();
 
@@ -267,14 +281,16 @@ impl Aim {
             &store_def,
             db,
             config.state_dir.as_deref(),
+            &mut HashMap::new(),
         )?;
 
-        let calendar = CalendarRecord::new(
+        let calendar = CalendarRecord::new_at(
             default_calendar_id.clone(),
             "Default".to_string(),
             "local".to_string(),
             0,
             true,
+            now,
         );
         db.calendars.upsert(calendar).await?;
 
@@ -291,26 +307,18 @@ impl Aim {
     async fn initialize_multi_calendars(
         config: &Config,
         db: &Db,
+        now: &Zoned,
     ) -> Result<InitializedStores, Box<dyn Error>> {
         if config.calendars.is_empty() {
             return Err("No calendars configured".into());
         }
 
-        let existing = db.calendars.list().await?;
-        let configured_ids: HashSet<_> = config
+        let configured_ids: Vec<&str> = config
             .calendars
             .iter()
-            .map(|calendar| &calendar.id)
+            .map(|calendar| calendar.id.as_str())
             .collect();
-        let mut auto_disabled = Vec::new();
-        for calendar in existing {
-            if configured_ids.contains(&calendar.id) || !calendar.enabled {
-                continue;
-            }
-
-            db.calendars.set_enabled(&calendar.id, false).await?;
-            auto_disabled.push(calendar.id);
-        }
+        let auto_disabled = db.calendars.disable_except(&configured_ids, now).await?;
 
         let mut effective = Vec::with_capacity(config.calendars.len());
         for calendar in &config.calendars {
@@ -324,18 +332,20 @@ impl Aim {
                 StoreDef::Local { .. } => "local",
                 StoreDef::Caldav { .. } => "caldav",
             };
-            let record = CalendarRecord::new(
+            let record = CalendarRecord::new_at(
                 calendar.id.clone(),
                 calendar.name.clone(),
                 calendar_kind.to_string(),
                 calendar.priority,
                 calendar.enabled,
+                now,
             );
             db.calendars.upsert(record).await?;
             effective.push((calendar, calendar.enabled));
         }
 
         let mut stores = HashMap::new();
+        let mut clients = HashMap::new();
         for (calendar, enabled) in &effective {
             if !enabled {
                 continue;
@@ -352,6 +362,7 @@ impl Aim {
                 store_def,
                 db,
                 config.state_dir.as_deref(),
+                &mut clients,
             )?;
             stores.insert(calendar.id.clone(), backend);
         }
@@ -457,12 +468,12 @@ impl Aim {
             .await
             .map_err(|e| format!("Failed to create event in store: {e}"))?;
 
-        // Store in database with resource mapping
-        self.db.upsert_event(&uid, &event, calendar_id).await?;
-        self.db
-            .resources
-            .insert(&uid, calendar_id, &resource_id, None)
+        // Store in database with resource mapping in a single transaction
+        let mut tx = self.db.begin().await?;
+        tx.upsert_event(&uid, &event, calendar_id).await?;
+        tx.insert_resource(&uid, calendar_id, &resource_id, None)
             .await?;
+        tx.commit().await?;
 
         let event = self.short_ids.event(event).await?;
         Ok(event)
@@ -478,18 +489,19 @@ impl Aim {
         patch: EventPatch,
     ) -> Result<impl Event + 'static, Box<dyn Error>> {
         let uid = self.short_ids.get_uid(id).await?;
-        let Some(_event) = self.db.events.get(&uid).await? else {
-            return Err("Event not found".into());
-        };
-
-        // Get calendar_id from event record
-        let event_record = self.db.events.get(&uid).await?.ok_or("Event not found")?;
-        let backend = self.get_store(&event_record.calendar_id)?;
+        // Look up the owning calendar without loading the whole record
+        let calendar_id = self
+            .db
+            .events
+            .get_calendar_id(&uid)
+            .await?
+            .ok_or("Event not found")?;
+        let backend = self.get_store(&calendar_id)?;
         let calendar_id = backend.calendar_id();
 
         // Update event through backend
         let updated_event = backend
-            .update_event(&uid, &patch)
+            .update_event_at(&uid, &patch, &self.now)
             .await
             .map_err(|e| format!("Failed to update event in store: {e}"))?;
 
@@ -515,12 +527,12 @@ impl Aim {
         let uid = id.as_uid();
 
         tracing::debug!(uid, "checking if id is an event");
-        if self.db.events.get(uid).await?.is_some() {
+        if self.db.events.exists(uid).await? {
             return Ok(Kind::Event);
         }
 
         tracing::debug!(uid, "checking if id is a todo");
-        if self.db.todos.get(uid).await?.is_some() {
+        if self.db.todos.exists(uid).await? {
             return Ok(Kind::Todo);
         }
 
@@ -595,12 +607,12 @@ impl Aim {
             .await
             .map_err(|e| format!("Failed to create todo in store: {e}"))?;
 
-        // Store in database with resource mapping
-        self.db.upsert_todo(&uid, &todo, calendar_id).await?;
-        self.db
-            .resources
-            .insert(&uid, calendar_id, &resource_id, None)
+        // Store in database with resource mapping in a single transaction
+        let mut tx = self.db.begin().await?;
+        tx.upsert_todo(&uid, &todo, calendar_id).await?;
+        tx.insert_resource(&uid, calendar_id, &resource_id, None)
             .await?;
+        tx.commit().await?;
 
         let todo_with_id = self.short_ids.todo(todo).await?;
         Ok(todo_with_id)
@@ -616,18 +628,19 @@ impl Aim {
         patch: TodoPatch,
     ) -> Result<impl Todo + 'static, Box<dyn Error>> {
         let uid = self.short_ids.get_uid(id).await?;
-        let Some(_todo) = self.db.todos.get(&uid).await? else {
-            return Err("Todo not found".into());
-        };
-
-        // Get calendar_id from todo record
-        let todo_record = self.db.todos.get(&uid).await?.ok_or("Todo not found")?;
-        let backend = self.get_store(&todo_record.calendar_id)?;
+        // Look up the owning calendar without loading the whole record
+        let calendar_id = self
+            .db
+            .todos
+            .get_calendar_id(&uid)
+            .await?
+            .ok_or("Todo not found")?;
+        let backend = self.get_store(&calendar_id)?;
         let calendar_id = backend.calendar_id();
 
         // Update todo through backend
         let updated_todo = backend
-            .update_todo(&uid, &patch)
+            .update_todo_at(&uid, &patch, &self.now)
             .await
             .map_err(|e| format!("Failed to update todo in store: {e}"))?;
 
@@ -712,14 +725,14 @@ impl Aim {
             });
 
         Ok(CalendarDetails {
-            id: record.id.clone(),
-            name: record.name.clone(),
-            kind: record.kind.clone(),
+            is_default: self.default_calendar == record.id,
+            id: record.id,
+            name: record.name,
+            kind: record.kind,
             priority: record.priority,
             enabled: record.enabled,
-            is_default: self.default_calendar == record.id,
-            created_at: record.created_at.clone(),
-            updated_at: record.updated_at.clone(),
+            created_at: record.created_at,
+            updated_at: record.updated_at,
             store: backend,
         })
     }
@@ -785,8 +798,8 @@ impl Aim {
             );
 
             let exists = match kind {
-                Kind::Event => self.db.events.get(&uid).await?.is_some(),
-                Kind::Todo => self.db.todos.get(&uid).await?.is_some(),
+                Kind::Event => self.db.events.exists(&uid).await?,
+                Kind::Todo => self.db.todos.exists(&uid).await?,
             };
             if exists {
                 tracing::debug!(uid, ?kind, "uid already exists in db");
@@ -22,8 +22,11 @@ fn default_timeout_secs() -> u64 {
     30
 }
 
+/// Default `User-Agent` for `CalDAV` requests, resolved at compile time.
+const DEFAULT_USER_AGENT: &str = concat!("aimcal/", env!("CARGO_PKG_VERSION"));
+
 fn default_user_agent() -> String {
-    "aimcal/0.11.0".to_string()
+    DEFAULT_USER_AGENT.to_string()
 }
 
 /// Store definition for shared connection configuration.
@@ -110,7 +113,10 @@ pub struct Config {
     pub default_priority: Priority,
 
     /// If true, items with no priority will be listed first.
-    #[serde(default)]
+    ///
+    /// Also accepted as `default_priority_none_first` in config files; the misspelled key is
+    /// kept for compatibility.
+    #[serde(default, alias = "default_priority_none_first")]
     pub default_priority_none_fist: bool,
 
     /// Parent directory of the config file.
@@ -549,6 +555,14 @@ default_priority_none_fist = true
         assert!(config.default_priority_none_fist);
     }
 
+    #[test]
+    fn parses_priority_none_first_alias() {
+        const TOML: &str = "default_priority_none_first = true";
+
+        let config: Config = toml::from_str(TOML).expect("Failed to parse TOML");
+        assert!(config.default_priority_none_fist);
+    }
+
     #[test]
     #[allow(clippy::needless_raw_string_hashes)]
     fn parses_minimal_toml_with_defaults() {
@@ -596,6 +610,19 @@ default_priority_none_fist = true
         }
     }
 
+    #[test]
+    fn default_user_agent_names_product_and_version() {
+        let user_agent = default_user_agent();
+
+        let version = user_agent
+            .strip_prefix("aimcal/")
+            .expect("user agent should start with the product name");
+        assert!(
+            version.starts_with(|c: char| c.is_ascii_digit()),
+            "expected a version after the product name, got {user_agent}"
+        );
+    }
+
     #[test]
     fn preserves_absolute_path() {
         let absolute_path = PathBuf::from("/etc/passwd");
@@ -11,7 +11,8 @@ use jiff::{Span, Zoned};
 
 use crate::RangePosition;
 use crate::datetime::util::{
-    STABLE_FORMAT_DATEONLY, STABLE_FORMAT_FLOATING, STABLE_FORMAT_LOCAL, end_of_day, start_of_day,
+    STABLE_FORMAT_DATEONLY, STABLE_FORMAT_FLOATING, STABLE_FORMAT_LOCAL, end_of_day,
+    format_stable_local, start_of_day,
 };
 
 /// A date and time that may be in different formats, such as date only, floating time, or local time with timezone.
@@ -121,7 +122,7 @@ impl LooseDateTime {
         match self {
             LooseDateTime::DateOnly(d) => d.strftime(STABLE_FORMAT_DATEONLY).to_string(),
             LooseDateTime::Floating(dt) => dt.strftime(STABLE_FORMAT_FLOATING).to_string(),
-            LooseDateTime::Local(zoned) => zoned.strftime(STABLE_FORMAT_LOCAL).to_string(),
+            LooseDateTime::Local(zoned) => format_stable_local(zoned),
         }
     }
 
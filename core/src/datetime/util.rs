@@ -2,6 +2,7 @@
 //
 // SPDX-License-Identifier: Apache-2.0
 
+use jiff::Zoned;
 use jiff::civil::Time;
 
 /// NOTE: Used for storing in the database, so it should be stable across different runs.
@@ -9,6 +10,11 @@ pub const STABLE_FORMAT_DATEONLY: &str = "%Y-%m-%d";
 pub const STABLE_FORMAT_FLOATING: &str = "%Y-%m-%dT%H:%M:%S";
 pub const STABLE_FORMAT_LOCAL: &str = "%Y-%m-%dT%H:%M:%S%z";
 
+/// Formats a zoned datetime with [`STABLE_FORMAT_LOCAL`].
+pub fn format_stable_local(dt: &Zoned) -> String {
+    dt.strftime(STABLE_FORMAT_LOCAL).to_string()
+}
+
 /// The position of a date relative to a range defined by a start and optional end date.
 #[derive(Debug, Clone, Copy, PartialEq, Eq)]
 pub enum RangePosition {
@@ -17,7 +17,10 @@ use std::error::Error;
 use std::path::Path;
 use std::sync::atomic::{AtomicU64, Ordering};
 
-use sqlx::sqlite::{SqliteConnectOptions, SqlitePool, SqlitePoolOptions};
+use sqlx::sqlite::{
+    SqliteConnectOptions, SqliteJournalMode, SqlitePool, SqlitePoolOptions, SqliteSynchronous,
+};
+use sqlx::{Sqlite, Transaction};
 
 use crate::db::calendars::Calendars;
 use crate::db::events::{EventRecord, Events};
@@ -26,6 +29,10 @@ use crate::db::short_ids::ShortIds;
 use crate::db::todos::{TodoRecord, Todos};
 use crate::{Event, Todo};
 
+/// Maximum number of UIDs bound in a single `IN (...)` list, well below SQLite's
+/// bound-parameter limit.
+const MAX_IN_LIST_LEN: usize = 500;
+
 /// Global counter for generating unique in-memory database names.
 static IN_MEMORY_DB_COUNTER: AtomicU64 = AtomicU64::new(0);
 
@@ -49,14 +56,19 @@ impl Db {
             tracing::info!(dir = %filename.display(), "connecting to SQLite database");
             let conn_opts = SqliteConnectOptions::new()
                 .filename(filename.to_str().ok_or("Invalid path encoding")?)
-                .create_if_missing(true);
+                .create_if_missing(true)
+                // In WAL mode, NORMAL skips the fsync on every commit while keeping the
+                // database consistent; only the last commits may be lost on power failure
+                .journal_mode(SqliteJournalMode::Wal)
+                .synchronous(SqliteSynchronous::Normal);
 
             (conn_opts, pool_opts)
         } else {
             tracing::info!("connecting to in-memory SQLite database");
             // Use shared in-memory database so all connections in the pool can access it
             // Generate a unique name per call for test isolation
-            let db_id = IN_MEMORY_DB_COUNTER.fetch_add(1, Ordering::SeqCst);
+            // Only uniqueness matters here, so no ordering with other memory is needed
+            let db_id = IN_MEMORY_DB_COUNTER.fetch_add(1, Ordering::Relaxed);
             let db_name = format!("file:memdb_{db_id}:?mode=memory&cache=shared");
 
             let conn_opts = SqliteConnectOptions::new()
@@ -118,9 +130,124 @@ impl Db {
             .map_err(|e| format!("Failed to upsert todo: {e}").into())
     }
 
+    /// Returns the underlying pool, e.g. to set up database state in tests.
+    #[cfg(test)]
+    pub fn pool(&self) -> &SqlitePool {
+        &self.pool
+    }
+
+    /// Begins a transaction so that several writes share a single commit.
+    pub async fn begin(&self) -> Result<DbTx, sqlx::Error> {
+        let tx = self.pool.begin().await?;
+        Ok(DbTx { tx })
+    }
+
     pub async fn close(self) -> Result<(), Box<dyn Error>> {
         tracing::debug!("closing database connection");
         self.pool.close().await;
         Ok(())
     }
 }
+
+/// A database transaction batching several writes into a single commit.
+///
+/// Dropping it without calling [`DbTx::commit`] rolls back all writes.
+#[derive(Debug)]
+pub struct DbTx {
+    tx: Transaction<'static, Sqlite>,
+}
+
+impl DbTx {
+    pub async fn upsert_event(
+        &mut self,
+        uid: &str,
+        event: &impl Event,
+        calendar_id: &str,
+    ) -> Result<(), Box<dyn Error>> {
+        let record = EventRecord::from_event(uid, event, calendar_id);
+        Events::upsert_in(&mut self.tx, &record)
+            .await
+            .map_err(|e| format!("Failed to upsert event: {e}").into())
+    }
+
+    pub async fn upsert_todo(
+        &mut self,
+        uid: &str,
+        todo: &impl Todo,
+        calendar_id: &str,
+    ) -> Result<(), Box<dyn Error>> {
+        let record = TodoRecord::from_todo(uid, todo, calendar_id);
+        Todos::upsert_in(&mut self.tx, &record)
+            .await
+            .map_err(|e| format!("Failed to upsert todo: {e}").into())
+    }
+
+    pub async fn insert_resource(
+        &mut self,
+        uid: &str,
+        calendar_id: &str,
+        resource_id: &str,
+        metadata: Option<&str>,
+    ) -> Result<(), sqlx::Error> {
+        Resources::insert_in(&mut self.tx, uid, calendar_id, resource_id, metadata).await
+    }
+
+    /// Deletes the events, todos and resources of the given UIDs in a calendar.
+    pub async fn delete_items(
+        &mut self,
+        uids: &[&str],
+        calendar_id: &str,
+    ) -> Result<(), sqlx::Error> {
+        Events::delete_many_in(&mut self.tx, uids).await?;
+        Todos::delete_many_in(&mut self.tx, uids).await?;
+        Resources::delete_many_in(&mut self.tx, uids, calendar_id).await
+    }
+
+    pub async fn commit(self) -> Result<(), sqlx::Error> {
+        self.tx.commit().await
+    }
+}
+
+/// Builds a `?, ?, ...` placeholder list for `n` bound parameters.
+fn placeholders(n: usize) -> String {
+    vec!["?"; n].join(", ")
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::db::tests_utils::{test_event, test_todo};
+
+    #[tokio::test]
+    async fn db_tx_delete_items_deletes_only_listed_uids() {
+        // Arrange
+        let db = Db::open(None).await.unwrap();
+        for uid in ["item-1", "item-2", "item-3"] {
+            db.upsert_event(uid, &test_event(uid, "Test Event"), "default")
+                .await
+                .unwrap();
+            db.upsert_todo(uid, &test_todo(uid, "Test Todo"), "default")
+                .await
+                .unwrap();
+            db.resources
+                .insert(uid, "default", &format!("file:///{uid}.ics"), None)
+                .await
+                .unwrap();
+        }
+
+        // Act
+        let mut tx = db.begin().await.unwrap();
+        tx.delete_items(&["item-1", "item-3"], "default")
+            .await
+            .unwrap();
+        tx.commit().await.unwrap();
+
+        // Assert
+        for (uid, kept) in [("item-1", false), ("item-2", true), ("item-3", false)] {
+            assert_eq!(db.events.get(uid).await.unwrap().is_some(), kept);
+            assert_eq!(db.todos.get(uid).await.unwrap().is_some(), kept);
+            let resource = db.resources.get(uid, "default").await.unwrap();
+            assert_eq!(resource.is_some(), kept);
+        }
+    }
+}
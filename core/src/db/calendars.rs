@@ -5,6 +5,11 @@
 use jiff::Zoned;
 use sqlx::SqlitePool;
 
+use crate::db::placeholders;
+
+/// Format of the `created_at` and `updated_at` columns.
+const TIMESTAMP_FORMAT: &str = "%Y-%m-%dT%H:%M:%S%.f%:z";
+
 #[derive(Debug, Clone)]
 pub struct Calendars {
     pool: SqlitePool,
@@ -24,7 +29,11 @@ ON CONFLICT(id) DO UPDATE SET
     kind = excluded.kind,
     priority = excluded.priority,
     enabled = excluded.enabled,
-    updated_at = excluded.updated_at;
+    updated_at = excluded.updated_at
+WHERE calendars.name     IS NOT excluded.name
+   OR calendars.kind     IS NOT excluded.kind
+   OR calendars.priority IS NOT excluded.priority
+   OR calendars.enabled  IS NOT excluded.enabled;
 ";
 
         sqlx::query(SQL)
@@ -75,23 +84,32 @@ ORDER BY priority ASC;
         sqlx::query_as(SQL).fetch_all(&self.pool).await
     }
 
-    pub async fn set_enabled(&self, id: &str, enabled: bool) -> Result<(), sqlx::Error> {
-        const SQL: &str = "\
+    /// Disables every enabled calendar whose ID is not in `keep_ids` and returns the IDs of
+    /// the disabled calendars, ordered by priority.
+    pub async fn disable_except(
+        &self,
+        keep_ids: &[&str],
+        now: &Zoned,
+    ) -> Result<Vec<String>, sqlx::Error> {
+        let placeholders = placeholders(keep_ids.len());
+        let sql = format!(
+            "\
 UPDATE calendars
-SET enabled = ?, updated_at = ?
-WHERE id = ?;
-";
-
-        let now = Zoned::now().strftime("%Y-%m-%dT%H:%M:%S%.f%:z").to_string();
+SET enabled = 0, updated_at = ?
+WHERE enabled = 1 AND id NOT IN ({placeholders})
+RETURNING id, priority;
+"
+        );
 
-        sqlx::query(SQL)
-            .bind(enabled)
-            .bind(&now)
-            .bind(id)
-            .execute(&self.pool)
-            .await?;
+        let now = format_timestamp(now);
+        let mut query = sqlx::query_as(sqlx::AssertSqlSafe(sql)).bind(&now);
+        for id in keep_ids {
+            query = query.bind(*id);
+        }
 
-        Ok(())
+        let mut disabled: Vec<(String, i32)> = query.fetch_all(&self.pool).await?;
+        disabled.sort_by_key(|(_, priority)| *priority);
+        Ok(disabled.into_iter().map(|(id, _)| id).collect())
     }
 
     pub async fn delete(&self, id: &str) -> Result<(), sqlx::Error> {
@@ -126,7 +144,22 @@ impl CalendarRecord {
     /// Creates a new calendar record with the given parameters.
     #[must_use]
     pub fn new(id: String, name: String, kind: String, priority: i32, enabled: bool) -> Self {
-        let now = Zoned::now().strftime("%Y-%m-%dT%H:%M:%S%.f%:z").to_string();
+        Self::new_at(id, name, kind, priority, enabled, &Zoned::now())
+    }
+
+    /// Creates a new calendar record stamped with the given time.
+    ///
+    /// Use this when creating several records at once to share a single clock reading.
+    #[must_use]
+    pub fn new_at(
+        id: String,
+        name: String,
+        kind: String,
+        priority: i32,
+        enabled: bool,
+        now: &Zoned,
+    ) -> Self {
+        let now = format_timestamp(now);
         Self {
             id,
             name,
@@ -139,6 +172,10 @@ impl CalendarRecord {
     }
 }
 
+fn format_timestamp(now: &Zoned) -> String {
+    now.strftime(TIMESTAMP_FORMAT).to_string()
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -209,6 +246,61 @@ mod tests {
         assert!(!retrieved.enabled);
     }
 
+    #[tokio::test]
+    async fn calendars_disable_except_disables_unlisted_enabled_calendars() {
+        // Arrange
+        let db = setup_test_db().await;
+        for (id, priority, enabled) in [("keep", 1, true), ("drop", 2, true), ("off", 3, false)] {
+            let calendar = CalendarRecord::new(
+                id.to_string(),
+                id.to_string(),
+                "local".to_string(),
+                priority,
+                enabled,
+            );
+            db.calendars.upsert(calendar).await.unwrap();
+        }
+
+        // Act
+        let disabled = db
+            .calendars
+            .disable_except(&["keep"], &Zoned::now())
+            .await
+            .unwrap();
+
+        // Assert
+        assert_eq!(disabled, vec!["default".to_string(), "drop".to_string()]);
+        assert!(db.calendars.get("keep").await.unwrap().unwrap().enabled);
+        assert!(!db.calendars.get("drop").await.unwrap().unwrap().enabled);
+        assert!(!db.calendars.get("default").await.unwrap().unwrap().enabled);
+    }
+
+    #[tokio::test]
+    async fn calendars_upsert_keeps_unchanged_calendar_untouched() {
+        // Arrange
+        let db = setup_test_db().await;
+        let first: Zoned = "2025-01-15T10:00:00+08:00[Asia/Shanghai]".parse().unwrap();
+        let later: Zoned = "2025-02-15T10:00:00+08:00[Asia/Shanghai]".parse().unwrap();
+        let record = |now: &Zoned| {
+            CalendarRecord::new_at(
+                "work".to_string(),
+                "Work".to_string(),
+                "local".to_string(),
+                1,
+                true,
+                now,
+            )
+        };
+        db.calendars.upsert(record(&first)).await.unwrap();
+
+        // Act
+        db.calendars.upsert(record(&later)).await.unwrap();
+
+        // Assert
+        let retrieved = db.calendars.get("work").await.unwrap().unwrap();
+        assert_eq!(retrieved.updated_at, "2025-01-15T10:00:00+08:00");
+    }
+
     #[tokio::test]
     async fn calendars_list_returns_all_calendars() {
         let db = setup_test_db().await;
@@ -263,27 +355,53 @@ mod tests {
     }
 
     #[tokio::test]
-    async fn calendars_set_enabled_toggles_enabled_flag() {
+    async fn calendars_disable_except_stamps_updated_at() {
+        // Arrange
         let db = setup_test_db().await;
+        let first: Zoned = "2025-01-15T10:00:00+08:00[Asia/Shanghai]".parse().unwrap();
+        let later: Zoned = "2025-02-15T10:00:00+08:00[Asia/Shanghai]".parse().unwrap();
+        for id in ["keep", "drop"] {
+            let calendar = CalendarRecord::new_at(
+                id.to_string(),
+                id.to_string(),
+                "local".to_string(),
+                1,
+                true,
+                &first,
+            );
+            db.calendars.upsert(calendar).await.unwrap();
+        }
 
-        let calendar = CalendarRecord::new(
-            "test-cal".to_string(),
-            "Test".to_string(),
-            "local".to_string(),
-            0,
-            true,
-        );
-        db.calendars.upsert(calendar).await.unwrap();
-
-        db.calendars.set_enabled("test-cal", false).await.unwrap();
+        // Act
+        db.calendars
+            .disable_except(&["default", "keep"], &later)
+            .await
+            .unwrap();
+
+        // Assert
+        let kept = db.calendars.get("keep").await.unwrap().unwrap();
+        let dropped = db.calendars.get("drop").await.unwrap().unwrap();
+        assert!(kept.enabled);
+        assert_eq!(kept.updated_at, "2025-01-15T10:00:00+08:00");
+        assert!(!dropped.enabled);
+        assert_eq!(dropped.updated_at, "2025-02-15T10:00:00+08:00");
+    }
 
-        let retrieved = db.calendars.get("test-cal").await.unwrap().unwrap();
-        assert!(!retrieved.enabled);
+    #[tokio::test]
+    async fn calendars_disable_except_keeps_all_listed_calendars() {
+        // Arrange
+        let db = setup_test_db().await;
 
-        db.calendars.set_enabled("test-cal", true).await.unwrap();
+        // Act
+        let disabled = db
+            .calendars
+            .disable_except(&["default"], &Zoned::now())
+            .await
+            .unwrap();
 
-        let retrieved = db.calendars.get("test-cal").await.unwrap().unwrap();
-        assert!(retrieved.enabled);
+        // Assert
+        assert!(disabled.is_empty());
+        assert!(db.calendars.get("default").await.unwrap().unwrap().enabled);
     }
 
     #[tokio::test]
@@ -328,4 +446,21 @@ mod tests {
         let names: Vec<&str> = calendars.iter().map(|c| c.name.as_str()).collect();
         assert_eq!(names, vec!["First", "Middle", "Second"]);
     }
+
+    #[test]
+    fn calendar_record_new_at_uses_given_timestamp() {
+        let now: Zoned = "2025-01-15T10:00:00+08:00[Asia/Shanghai]".parse().unwrap();
+
+        let calendar = CalendarRecord::new_at(
+            "work".to_string(),
+            "Work".to_string(),
+            "local".to_string(),
+            0,
+            true,
+            &now,
+        );
+
+        assert_eq!(calendar.created_at, "2025-01-15T10:00:00+08:00");
+        assert_eq!(calendar.updated_at, calendar.created_at);
+    }
 }
@@ -3,11 +3,13 @@
 // SPDX-License-Identifier: Apache-2.0
 
 use std::borrow::Cow;
+use std::num::NonZeroU32;
 
-use jiff::{Zoned, civil::Date};
-use sqlx::{Sqlite, SqlitePool, query::QueryAs, sqlite::SqliteArguments};
+use jiff::civil::Date;
+use sqlx::{Sqlite, SqliteConnection, SqlitePool, query::QueryAs, sqlite::SqliteArguments};
 
-use crate::datetime::{STABLE_FORMAT_DATEONLY, STABLE_FORMAT_LOCAL};
+use crate::datetime::{STABLE_FORMAT_DATEONLY, format_stable_local};
+use crate::db::{MAX_IN_LIST_LEN, placeholders};
 use crate::event::ResolvedEventConditions;
 use crate::{Event, EventStatus, LooseDateTime, Pager};
 
@@ -22,6 +24,15 @@ impl Events {
     }
 
     pub async fn upsert(&self, event: EventRecord) -> Result<(), sqlx::Error> {
+        let mut conn = self.pool.acquire().await?;
+        Self::upsert_in(&mut conn, &event).await
+    }
+
+    /// Upserts an event on the given connection, e.g. inside a transaction.
+    pub async fn upsert_in(
+        conn: &mut SqliteConnection,
+        event: &EventRecord,
+    ) -> Result<(), sqlx::Error> {
         const SQL: &str = "\
 INSERT INTO events (uid, calendar_id, summary, description, status, start, end)
 VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -31,7 +42,13 @@ ON CONFLICT(uid) DO UPDATE SET
     description  = excluded.description,
     status       = excluded.status,
     start        = excluded.start,
-    end          = excluded.end;
+    end          = excluded.end
+WHERE events.calendar_id IS NOT excluded.calendar_id
+   OR events.summary     IS NOT excluded.summary
+   OR events.description IS NOT excluded.description
+   OR events.status      IS NOT excluded.status
+   OR events.start       IS NOT excluded.start
+   OR events.end         IS NOT excluded.end;
 ";
 
         sqlx::query(SQL)
@@ -42,7 +59,7 @@ ON CONFLICT(uid) DO UPDATE SET
             .bind(&event.status)
             .bind(&event.start)
             .bind(&event.end)
-            .execute(&self.pool)
+            .execute(conn)
             .await?;
 
         Ok(())
@@ -50,9 +67,10 @@ ON CONFLICT(uid) DO UPDATE SET
 
     pub async fn get(&self, uid: &str) -> Result<Option<EventRecord>, sqlx::Error> {
         const SQL: &str = "\
-SELECT uid, calendar_id, summary, description, status, start, end
+SELECT events.uid, calendar_id, summary, description, status, start, end, short_ids.short_id
 FROM events
-WHERE uid = ?;
+LEFT JOIN short_ids ON short_ids.uid = events.uid
+WHERE events.uid = ?;
 ";
 
         sqlx::query_as(SQL)
@@ -61,15 +79,35 @@ WHERE uid = ?;
             .await
     }
 
+    /// Checks whether an event with the given UID exists, without loading the row.
+    pub async fn exists(&self, uid: &str) -> Result<bool, sqlx::Error> {
+        const SQL: &str = "SELECT EXISTS(SELECT 1 FROM events WHERE uid = ?);";
+
+        let (exists,): (bool,) = sqlx::query_as(SQL).bind(uid).fetch_one(&self.pool).await?;
+        Ok(exists)
+    }
+
+    /// Gets the owning calendar of the event with the given UID, without loading the row.
+    pub async fn get_calendar_id(&self, uid: &str) -> Result<Option<String>, sqlx::Error> {
+        const SQL: &str = "SELECT calendar_id FROM events WHERE uid = ?;";
+
+        let row: Option<(String,)> = sqlx::query_as(SQL)
+            .bind(uid)
+            .fetch_optional(&self.pool)
+            .await?;
+        Ok(row.map(|(calendar_id,)| calendar_id))
+    }
+
     pub async fn list(
         &self,
         conds: &ResolvedEventConditions,
         pager: &Pager,
     ) -> Result<Vec<EventRecord>, sqlx::Error> {
         let mut sql = "\
-SELECT uid, calendar_id, summary, description, status, start, end
+SELECT events.uid, calendar_id, summary, description, status, start, end, short_ids.short_id
 FROM events
 JOIN calendars ON calendars.id = events.calendar_id
+LEFT JOIN short_ids ON short_ids.uid = events.uid
 "
         .to_string();
         sql += &Self::build_where(conds);
@@ -117,9 +155,22 @@ LIMIT 1;
         Ok(row.0)
     }
 
-    pub async fn delete(&self, uid: &str) -> Result<(), sqlx::Error> {
-        const SQL: &str = "DELETE FROM events WHERE uid = ?;";
-        sqlx::query(SQL).bind(uid).execute(&self.pool).await?;
+    /// Deletes the events with the given UIDs on the given connection, e.g. inside a transaction.
+    pub async fn delete_many_in(
+        conn: &mut SqliteConnection,
+        uids: &[&str],
+    ) -> Result<(), sqlx::Error> {
+        for chunk in uids.chunks(MAX_IN_LIST_LEN) {
+            let sql = format!(
+                "DELETE FROM events WHERE uid IN ({});",
+                placeholders(chunk.len())
+            );
+            let mut query = sqlx::query(sqlx::AssertSqlSafe(sql));
+            for uid in chunk {
+                query = query.bind(*uid);
+            }
+            query.execute(&mut *conn).await?;
+        }
         Ok(())
     }
 
@@ -143,11 +194,11 @@ LIMIT 1;
         mut query: QueryAs<'a, Sqlite, O, SqliteArguments>,
     ) -> QueryAs<'a, Sqlite, O, SqliteArguments> {
         if let Some(ref start_before) = conds.start_before {
-            query = query.bind(format_dt(start_before));
+            query = query.bind(format_stable_local(start_before));
         }
         if let Some(ref end_after) = conds.end_after {
             query = query
-                .bind(format_dt(end_after))
+                .bind(format_stable_local(end_after))
                 .bind(format_date(end_after.date()));
         }
         if let Some(ref calendar_id) = conds.calendar_id {
@@ -167,6 +218,9 @@ pub struct EventRecord {
     end: String,
     /// Calendar ID for this event.
     pub calendar_id: String,
+    /// Short ID joined from `short_ids` by `get` and `list`, if already assigned.
+    #[sqlx(default)]
+    short_id: Option<u32>,
 }
 
 impl EventRecord {
@@ -174,14 +228,12 @@ impl EventRecord {
         Self {
             uid: uid.to_string(),
             calendar_id: calendar_id.to_string(),
-            summary: event.summary().to_string(),
-            description: event
-                .description()
-                .map(|a| a.to_string())
-                .unwrap_or_default(),
+            summary: event.summary().into_owned(),
+            description: event.description().map(Cow::into_owned).unwrap_or_default(),
             status: event.status().map(|s| s.to_string()).unwrap_or_default(),
             start: event.start().map(|a| a.format_stable()).unwrap_or_default(),
             end: event.end().map(|a| a.format_stable()).unwrap_or_default(),
+            short_id: None,
         }
     }
 
@@ -192,6 +244,10 @@ impl EventRecord {
 }
 
 impl Event for EventRecord {
+    fn short_id(&self) -> Option<NonZeroU32> {
+        self.short_id.and_then(NonZeroU32::new)
+    }
+
     fn uid(&self) -> Cow<'_, str> {
         (&self.uid).into()
     }
@@ -221,10 +277,6 @@ fn format_date(date: Date) -> String {
     date.strftime(STABLE_FORMAT_DATEONLY).to_string()
 }
 
-fn format_dt(dt: &Zoned) -> String {
-    dt.strftime(STABLE_FORMAT_LOCAL).to_string()
-}
-
 #[cfg(test)]
 mod tests {
     use jiff::civil;
@@ -915,4 +967,71 @@ mod tests {
         // Assert
         assert_eq!(count, 1);
     }
+
+    #[tokio::test]
+    async fn events_exists_reports_presence_by_uid() {
+        // Arrange
+        let db = setup_test_db().await;
+        let event = test_event("event-1", "Test Event");
+        let record = EventRecord::from_event("event-1", &event, "default");
+        db.events.upsert(record).await.unwrap();
+
+        // Act
+        let found = db.events.exists("event-1").await.unwrap();
+        let missing = db.events.exists("nonexistent").await.unwrap();
+
+        // Assert
+        assert!(found);
+        assert!(!missing);
+    }
+
+    #[tokio::test]
+    async fn events_get_calendar_id_returns_owning_calendar() {
+        // Arrange
+        let db = setup_test_db().await;
+        let event = test_event("event-1", "Test Event");
+        let record = EventRecord::from_event("event-1", &event, "default");
+        db.events.upsert(record).await.unwrap();
+
+        // Act
+        let found = db.events.get_calendar_id("event-1").await.unwrap();
+        let missing = db.events.get_calendar_id("nonexistent").await.unwrap();
+
+        // Assert
+        assert_eq!(found.as_deref(), Some("default"));
+        assert_eq!(missing, None);
+    }
+
+    #[tokio::test]
+    async fn events_list_joins_assigned_short_ids() {
+        // Arrange
+        let db = setup_test_db().await;
+        for uid in ["event-1", "event-2"] {
+            let event = test_event(uid, "Test Event");
+            let record = EventRecord::from_event(uid, &event, "default");
+            db.events.upsert(record).await.unwrap();
+        }
+        let short_id = db
+            .short_ids
+            .get_or_assign_short_id("event-1", crate::Kind::Event)
+            .await
+            .unwrap();
+
+        // Act
+        let conds = ResolvedEventConditions {
+            start_before: None,
+            end_after: None,
+            calendar_id: None,
+        };
+        let pager = Pager {
+            limit: 10,
+            offset: 0,
+        };
+        let results = db.events.list(&conds, &pager).await.unwrap();
+
+        // Assert
+        let get = |uid: &str| results.iter().find(|e| e.uid() == uid).unwrap();
+        assert_eq!(get("event-1").short_id(), Some(short_id));
+        assert_eq!(get("event-2").short_id(), None);
+    }
 }
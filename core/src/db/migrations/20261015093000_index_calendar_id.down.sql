@@ -0,0 +1,4 @@
+-- Drop calendar ownership indexes of events and todos
+
+DROP INDEX IF EXISTS idx_events_calendar;
+DROP INDEX IF EXISTS idx_todos_calendar;
@@ -0,0 +1,6 @@
+-- Index calendar ownership of events and todos
+-- Listing and counting filter on calendar_id and join it against calendars,
+-- which otherwise needs a full table scan
+
+CREATE INDEX IF NOT EXISTS idx_events_calendar ON events(calendar_id);
+CREATE INDEX IF NOT EXISTS idx_todos_calendar ON todos(calendar_id);
@@ -21,7 +21,7 @@ use crate::db::IN_MEMORY_DB_COUNTER;
 
 /// Creates a database pool without running migrations automatically.
 async fn create_pool_without_migrations() -> SqlitePool {
-    let db_id = IN_MEMORY_DB_COUNTER.fetch_add(1, Ordering::SeqCst);
+    let db_id = IN_MEMORY_DB_COUNTER.fetch_add(1, Ordering::Relaxed);
     let db_name = format!("file:memdb_{db_id}:?mode=memory&cache=shared");
 
     let conn_opts = SqliteConnectOptions::new()
@@ -629,6 +629,40 @@ async fn migrations_ics_optional_creates_index() {
     // Drop test database
 }
 
+#[tokio::test]
+async fn migrations_index_calendar_id_creates_and_drops_indexes() {
+    let pool = create_pool_without_migrations().await;
+
+    apply_migration(&pool, "20250801070804_init_events_todos").await;
+    apply_migration(&pool, "20250801095832_add_short_ids").await;
+    apply_migration(&pool, "20250805075731_drop_autoincrement").await;
+    apply_migration(&pool, "20260131235400_ics_optional").await;
+    apply_migration(&pool, "20260309102201_add_calendars").await;
+
+    apply_migration(&pool, "20261015093000_index_calendar_id").await;
+
+    let indexes: Vec<(String,)> = sqlx::query_as(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name IN ('events', 'todos')",
+    )
+    .fetch_all(&pool)
+    .await
+    .unwrap();
+    let index_names: Vec<_> = indexes.into_iter().map(|(name,)| name).collect();
+    assert!(index_names.contains(&"idx_events_calendar".to_string()));
+    assert!(index_names.contains(&"idx_todos_calendar".to_string()));
+
+    apply_down_migration(&pool, "20261015093000_index_calendar_id").await;
+
+    let (remaining,): (i64,) = sqlx::query_as(
+        "SELECT COUNT(*) FROM sqlite_master \
+         WHERE type='index' AND name IN ('idx_events_calendar', 'idx_todos_calendar')",
+    )
+    .fetch_one(&pool)
+    .await
+    .unwrap();
+    assert_eq!(remaining, 0);
+}
+
 #[tokio::test]
 async fn migrations_ics_optional_full_cycle() {
     let pool = create_pool_without_migrations().await;
@@ -2,7 +2,9 @@
 //
 // SPDX-License-Identifier: Apache-2.0
 
-use sqlx::SqlitePool;
+use sqlx::{SqliteConnection, SqlitePool};
+
+use crate::db::{MAX_IN_LIST_LEN, placeholders};
 
 #[derive(Debug, Clone)]
 pub struct Resources {
@@ -20,13 +22,27 @@ impl Resources {
         calendar_id: &str,
         resource_id: &str,
         metadata: Option<&str>,
+    ) -> Result<(), sqlx::Error> {
+        let mut conn = self.pool.acquire().await?;
+        Self::insert_in(&mut conn, uid, calendar_id, resource_id, metadata).await
+    }
+
+    /// Inserts or updates a resource on the given connection, e.g. inside a transaction.
+    pub async fn insert_in(
+        conn: &mut SqliteConnection,
+        uid: &str,
+        calendar_id: &str,
+        resource_id: &str,
+        metadata: Option<&str>,
     ) -> Result<(), sqlx::Error> {
         const SQL: &str = "
 INSERT INTO resources (uid, calendar_id, resource_id, metadata)
 VALUES (?, ?, ?, ?)
 ON CONFLICT(uid, calendar_id) DO UPDATE SET
     resource_id = excluded.resource_id,
-    metadata = excluded.metadata;
+    metadata = excluded.metadata
+WHERE resources.resource_id IS NOT excluded.resource_id
+   OR resources.metadata    IS NOT excluded.metadata;
 ";
 
         sqlx::query(SQL)
@@ -34,7 +50,7 @@ ON CONFLICT(uid, calendar_id) DO UPDATE SET
             .bind(calendar_id)
             .bind(resource_id)
             .bind(metadata)
-            .execute(&self.pool)
+            .execute(conn)
             .await?;
 
         Ok(())
@@ -58,19 +74,48 @@ WHERE uid = ? AND calendar_id = ?;
             .await
     }
 
-    #[allow(dead_code)]
     pub async fn delete(&self, uid: &str, calendar_id: &str) -> Result<(), sqlx::Error> {
-        const SQL: &str = "DELETE FROM resources WHERE uid = ? AND calendar_id = ?;";
-
-        sqlx::query(SQL)
-            .bind(uid)
-            .bind(calendar_id)
-            .execute(&self.pool)
-            .await?;
+        let mut conn = self.pool.acquire().await?;
+        Self::delete_many_in(&mut conn, &[uid], calendar_id).await
+    }
 
+    /// Deletes the resources of the given UIDs in a calendar on the given connection, e.g.
+    /// inside a transaction.
+    pub async fn delete_many_in(
+        conn: &mut SqliteConnection,
+        uids: &[&str],
+        calendar_id: &str,
+    ) -> Result<(), sqlx::Error> {
+        for chunk in uids.chunks(MAX_IN_LIST_LEN) {
+            let sql = format!(
+                "DELETE FROM resources WHERE calendar_id = ? AND uid IN ({});",
+                placeholders(chunk.len())
+            );
+            let mut query = sqlx::query(sqlx::AssertSqlSafe(sql)).bind(calendar_id);
+            for uid in chunk {
+                query = query.bind(*uid);
+            }
+            query.execute(&mut *conn).await?;
+        }
         Ok(())
     }
 
+    pub async fn list_by_calendar(
+        &self,
+        calendar_id: &str,
+    ) -> Result<Vec<ResourceRecord>, sqlx::Error> {
+        const SQL: &str = "
+SELECT uid, calendar_id, resource_id, metadata
+FROM resources
+WHERE calendar_id = ?;
+";
+
+        sqlx::query_as(SQL)
+            .bind(calendar_id)
+            .fetch_all(&self.pool)
+            .await
+    }
+
     pub async fn list_uids_by_calendar(
         &self,
         calendar_id: &str,
@@ -256,4 +301,29 @@ mod tests {
         assert_eq!(metadata.etag, "\"abc123\"");
         assert_eq!(metadata.version, 1);
     }
+
+    #[tokio::test]
+    async fn resources_list_by_calendar_returns_only_matching_calendar() {
+        let db = setup_test_db().await;
+
+        db.resources
+            .insert("uid-1", "work", "/dav/work/uid-1.ics", Some("{}"))
+            .await
+            .unwrap();
+        db.resources
+            .insert("uid-2", "work", "/dav/work/uid-2.ics", None)
+            .await
+            .unwrap();
+        db.resources
+            .insert("uid-3", "personal", "/dav/personal/uid-3.ics", None)
+            .await
+            .unwrap();
+
+        let mut resources = db.resources.list_by_calendar("work").await.unwrap();
+        resources.sort_by(|a, b| a.uid.cmp(&b.uid));
+
+        let uids: Vec<&str> = resources.iter().map(|r| r.uid.as_str()).collect();
+        assert_eq!(uids, vec!["uid-1", "uid-2"]);
+        assert!(resources.iter().all(|r| r.calendar_id == "work"));
+    }
 }
@@ -4,10 +4,29 @@
 
 use std::num::NonZeroU32;
 
-use sqlx::SqlitePool;
+use sqlx::{SqliteConnection, SqlitePool};
 
 use crate::{Kind, short_id::UidAndShortId};
 
+const SQL_SELECT: &str = "SELECT short_id FROM short_ids WHERE uid = ?;";
+
+// In SQLite, every table (unless declared WITHOUT ROWID) maintains a hidden ROWID column.
+//
+// When a column is defined as `INTEGER PRIMARY KEY`, it becomes an alias for the ROWID,
+// and SQLite will automatically assign it a value one greater than the current maximum.
+//
+// `AUTOINCREMENT` is an alternative that guarantees IDs are never reused, even after
+// deletions or conflicts. However, unlike ROWID, it may reserve or skip IDs when an insert
+// fails or is ignored due to a conflict.
+//
+// In our case, we prefer `short_id` values to remain as small and compact as possible,
+// so we intentionally avoid using AUTOINCREMENT.
+const SQL_INSERT: &str = "\
+INSERT INTO short_ids (uid, kind) VALUES (?, ?)
+ON CONFLICT(uid) DO NOTHING
+RETURNING short_id;
+";
+
 #[derive(Debug, Clone)]
 pub struct ShortIds {
     pool: SqlitePool,
@@ -48,38 +67,74 @@ impl ShortIds {
         uid: &str,
         kind: Kind,
     ) -> Result<NonZeroU32, sqlx::Error> {
-        // In SQLite, every table (unless declared WITHOUT ROWID) maintains a hidden ROWID column.
-        //
-        // When a column is defined as `INTEGER PRIMARY KEY`, it becomes an alias for the ROWID,
-        // and SQLite will automatically assign it a value one greater than the current maximum.
-        //
-        // `AUTOINCREMENT` is an alternative that guarantees IDs are never reused, even after
-        // deletions or conflicts. However, unlike ROWID, it may reserve or skip IDs when an insert
-        // fails or is ignored due to a conflict.
-        //
-        // In our case, we prefer `short_id` values to remain as small and compact as possible,
-        // so we intentionally avoid using AUTOINCREMENT.
-        const SQL: &str = "\
-INSERT INTO short_ids (uid, kind) VALUES (?, ?)
-ON CONFLICT(uid) DO NOTHING
-RETURNING short_id;
-";
+        let mut conn = self.pool.acquire().await?;
+        Self::get_or_assign_short_id_in(&mut conn, uid, kind).await
+    }
+
+    /// Gets or assigns short IDs for many UIDs of the same kind in a single transaction,
+    /// returning them in the same order as `uids`.
+    ///
+    /// Callers pass UIDs that are not expected to have a short ID yet, e.g. records whose
+    /// joined short ID is missing, so each UID is inserted first.
+    pub async fn get_or_assign_short_ids(
+        &self,
+        uids: &[String],
+        kind: Kind,
+    ) -> Result<Vec<NonZeroU32>, sqlx::Error> {
+        if uids.is_empty() {
+            return Ok(Vec::new());
+        }
+
+        // Take the write lock up front: a deferred transaction that reads first and upgrades
+        // to a write later fails with SQLITE_BUSY, without retrying, if another connection
+        // commits in between
+        let mut tx = self.pool.begin_with("BEGIN IMMEDIATE").await?;
+        let mut short_ids = Vec::with_capacity(uids.len());
+        for uid in uids {
+            short_ids.push(Self::assign_short_id_in(&mut tx, uid, kind).await?);
+        }
+        tx.commit().await?;
+        Ok(short_ids)
+    }
+
+    /// Gets or assigns a short ID, reading first so that UIDs which already have one do not
+    /// take the write lock.
+    async fn get_or_assign_short_id_in(
+        conn: &mut SqliteConnection,
+        uid: &str,
+        kind: Kind,
+    ) -> Result<NonZeroU32, sqlx::Error> {
+        if let Some((short_id,)) = sqlx::query_as::<_, (NonZeroU32,)>(SQL_SELECT)
+            .bind(uid)
+            .fetch_optional(&mut *conn)
+            .await?
+        {
+            return Ok(short_id);
+        }
 
-        if let Some((short_id,)) = sqlx::query_as::<_, (NonZeroU32,)>(SQL)
+        Self::assign_short_id_in(conn, uid, kind).await
+    }
+
+    /// Assigns a short ID, inserting first since the caller expects the UID to be new.
+    async fn assign_short_id_in(
+        conn: &mut SqliteConnection,
+        uid: &str,
+        kind: Kind,
+    ) -> Result<NonZeroU32, sqlx::Error> {
+        if let Some((short_id,)) = sqlx::query_as::<_, (NonZeroU32,)>(SQL_INSERT)
             .bind(uid)
             .bind(kind.to_str_stable())
-            .fetch_optional(&self.pool)
+            .fetch_optional(&mut *conn)
             .await?
         {
             return Ok(short_id);
         }
 
-        // if the insert did not return a short_id, it means the uid already exists
-        let (short_id,): (NonZeroU32,) =
-            sqlx::query_as("SELECT short_id FROM short_ids WHERE uid = ?")
-                .bind(uid)
-                .fetch_one(&self.pool)
-                .await?;
+        // if the insert did not return a short_id, the uid was assigned in the meantime
+        let (short_id,): (NonZeroU32,) = sqlx::query_as(SQL_SELECT)
+            .bind(uid)
+            .fetch_one(&mut *conn)
+            .await?;
 
         Ok(short_id)
     }
@@ -233,6 +288,33 @@ mod tests {
         assert_eq!(first_id.get(), 1);
     }
 
+    #[tokio::test]
+    async fn short_ids_get_or_assign_short_ids_keeps_input_order() {
+        // Arrange
+        let db = setup_test_db().await;
+        let existing = db
+            .short_ids
+            .get_or_assign_short_id("uid-2", Kind::Event)
+            .await
+            .expect("Failed to assign short ID");
+        let uids = vec![
+            "uid-1".to_string(),
+            "uid-2".to_string(),
+            "uid-3".to_string(),
+        ];
+
+        // Act
+        let short_ids = db
+            .short_ids
+            .get_or_assign_short_ids(&uids, Kind::Event)
+            .await
+            .expect("Failed to assign short IDs");
+
+        // Assert
+        let short_ids: Vec<u32> = short_ids.into_iter().map(NonZeroU32::get).collect();
+        assert_eq!(short_ids, vec![2, existing.get(), 3]);
+    }
+
     #[tokio::test]
     async fn short_ids_get_by_short_id_returns_correct_data() {
         // Arrange
@@ -3,11 +3,13 @@
 // SPDX-License-Identifier: Apache-2.0
 
 use std::borrow::Cow;
+use std::num::NonZeroU32;
 
 use jiff::Zoned;
-use sqlx::{Sqlite, SqlitePool, query::QueryAs, sqlite::SqliteArguments};
+use sqlx::{Sqlite, SqliteConnection, SqlitePool, query::QueryAs, sqlite::SqliteArguments};
 
-use crate::datetime::STABLE_FORMAT_LOCAL;
+use crate::datetime::{STABLE_FORMAT_LOCAL, format_stable_local};
+use crate::db::{MAX_IN_LIST_LEN, placeholders};
 use crate::todo::{ResolvedTodoConditions, ResolvedTodoSort};
 use crate::{LooseDateTime, Pager, Priority, Todo, TodoStatus};
 
@@ -22,6 +24,15 @@ impl Todos {
     }
 
     pub async fn upsert(&self, todo: &TodoRecord) -> Result<(), sqlx::Error> {
+        let mut conn = self.pool.acquire().await?;
+        Self::upsert_in(&mut conn, todo).await
+    }
+
+    /// Upserts a todo on the given connection, e.g. inside a transaction.
+    pub async fn upsert_in(
+        conn: &mut SqliteConnection,
+        todo: &TodoRecord,
+    ) -> Result<(), sqlx::Error> {
         const SQL: &str = "\
 INSERT INTO todos (uid, calendar_id, completed, description, percent, priority, status, summary, due)
 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -33,7 +44,15 @@ ON CONFLICT(uid) DO UPDATE SET
     priority     = excluded.priority,
     status       = excluded.status,
     summary      = excluded.summary,
-    due          = excluded.due;
+    due          = excluded.due
+WHERE todos.calendar_id IS NOT excluded.calendar_id
+   OR todos.completed   IS NOT excluded.completed
+   OR todos.description IS NOT excluded.description
+   OR todos.percent     IS NOT excluded.percent
+   OR todos.priority    IS NOT excluded.priority
+   OR todos.status      IS NOT excluded.status
+   OR todos.summary     IS NOT excluded.summary
+   OR todos.due         IS NOT excluded.due;
 ";
 
         sqlx::query(SQL)
@@ -46,7 +65,7 @@ ON CONFLICT(uid) DO UPDATE SET
             .bind(&todo.status)
             .bind(&todo.summary)
             .bind(&todo.due)
-            .execute(&self.pool)
+            .execute(conn)
             .await?;
 
         Ok(())
@@ -54,9 +73,11 @@ ON CONFLICT(uid) DO UPDATE SET
 
     pub async fn get(&self, uid: &str) -> Result<Option<TodoRecord>, sqlx::Error> {
         const SQL: &str = "\
-SELECT uid, calendar_id, completed, description, percent, priority, status, summary, due
-FROM todos
-WHERE uid = ?;
+SELECT t.uid, t.calendar_id, t.completed, t.description, t.percent, t.priority, t.status,
+       t.summary, t.due, s.short_id
+FROM todos AS t
+LEFT JOIN short_ids AS s ON s.uid = t.uid
+WHERE t.uid = ?;
 ";
 
         sqlx::query_as(SQL)
@@ -65,6 +86,25 @@ WHERE uid = ?;
             .await
     }
 
+    /// Checks whether a todo with the given UID exists, without loading the row.
+    pub async fn exists(&self, uid: &str) -> Result<bool, sqlx::Error> {
+        const SQL: &str = "SELECT EXISTS(SELECT 1 FROM todos WHERE uid = ?);";
+
+        let (exists,): (bool,) = sqlx::query_as(SQL).bind(uid).fetch_one(&self.pool).await?;
+        Ok(exists)
+    }
+
+    /// Gets the owning calendar of the todo with the given UID, without loading the row.
+    pub async fn get_calendar_id(&self, uid: &str) -> Result<Option<String>, sqlx::Error> {
+        const SQL: &str = "SELECT calendar_id FROM todos WHERE uid = ?;";
+
+        let row: Option<(String,)> = sqlx::query_as(SQL)
+            .bind(uid)
+            .fetch_optional(&self.pool)
+            .await?;
+        Ok(row.map(|(calendar_id,)| calendar_id))
+    }
+
     pub async fn list(
         &self,
         conds: &ResolvedTodoConditions,
@@ -73,9 +113,10 @@ WHERE uid = ?;
     ) -> Result<Vec<TodoRecord>, sqlx::Error> {
         let mut sql = "\
 SELECT t.uid, t.calendar_id, t.completed, t.description, t.percent,
-       t.priority AS priority, t.status, t.summary, t.due
+       t.priority AS priority, t.status, t.summary, t.due, s.short_id
 FROM todos AS t
 JOIN calendars AS c ON c.id = t.calendar_id
+LEFT JOIN short_ids AS s ON s.uid = t.uid
 "
         .to_string();
         sql += &Self::build_where(conds);
@@ -145,9 +186,22 @@ LIMIT 1;
         Ok(row.0)
     }
 
-    pub async fn delete(&self, uid: &str) -> Result<(), sqlx::Error> {
-        const SQL: &str = "DELETE FROM todos WHERE uid = ?;";
-        sqlx::query(SQL).bind(uid).execute(&self.pool).await?;
+    /// Deletes the todos with the given UIDs on the given connection, e.g. inside a transaction.
+    pub async fn delete_many_in(
+        conn: &mut SqliteConnection,
+        uids: &[&str],
+    ) -> Result<(), sqlx::Error> {
+        for chunk in uids.chunks(MAX_IN_LIST_LEN) {
+            let sql = format!(
+                "DELETE FROM todos WHERE uid IN ({});",
+                placeholders(chunk.len())
+            );
+            let mut query = sqlx::query(sqlx::AssertSqlSafe(sql));
+            for uid in chunk {
+                query = query.bind(*uid);
+            }
+            query.execute(&mut *conn).await?;
+        }
         Ok(())
     }
 
@@ -175,7 +229,7 @@ LIMIT 1;
             query = query.bind(status);
         }
         if let Some(ref due) = conds.due {
-            query = query.bind(format_dt(due));
+            query = query.bind(format_stable_local(due));
         }
         if let Some(ref calendar_id) = conds.calendar_id {
             query = query.bind(calendar_id);
@@ -196,6 +250,9 @@ pub struct TodoRecord {
     status: String,
     summary: String,
     due: String,
+    /// Short ID joined from `short_ids` by `get` and `list`, if already assigned.
+    #[sqlx(default)]
+    short_id: Option<u32>,
 }
 
 impl TodoRecord {
@@ -203,16 +260,17 @@ impl TodoRecord {
         Self {
             uid: uid.to_string(),
             calendar_id: calendar_id.to_string(),
-            summary: todo.summary().to_string(),
-            description: todo.description().unwrap_or_default().to_string(),
+            summary: todo.summary().into_owned(),
+            description: todo.description().map(Cow::into_owned).unwrap_or_default(),
             due: todo.due().map(|a| a.format_stable()).unwrap_or_default(),
             completed: todo
                 .completed()
-                .map(|dt| format_dt(&dt))
+                .map(|dt| format_stable_local(&dt))
                 .unwrap_or_default(),
             percent: todo.percent_complete(),
             priority: todo.priority().into(),
             status: todo.status().to_string(),
+            short_id: None,
         }
     }
 
@@ -223,6 +281,10 @@ impl TodoRecord {
 }
 
 impl Todo for TodoRecord {
+    fn short_id(&self) -> Option<NonZeroU32> {
+        self.short_id.and_then(NonZeroU32::new)
+    }
+
     fn uid(&self) -> Cow<'_, str> {
         self.uid.as_str().into()
     }
@@ -258,10 +320,6 @@ impl Todo for TodoRecord {
     }
 }
 
-fn format_dt(dt: &Zoned) -> String {
-    dt.strftime(STABLE_FORMAT_LOCAL).to_string()
-}
-
 #[cfg(test)]
 mod tests {
     use jiff::civil;
@@ -1151,4 +1209,60 @@ mod tests {
         // Assert
         assert_eq!(count, 1);
     }
+
+    #[tokio::test]
+    async fn todos_exists_reports_presence_by_uid() {
+        // Arrange
+        let db = setup_test_db().await;
+        let todo = test_todo("todo-1", "Test Todo");
+        let record = TodoRecord::from_todo("todo-1", &todo, "default");
+        db.todos.upsert(&record).await.unwrap();
+
+        // Act
+        let found = db.todos.exists("todo-1").await.unwrap();
+        let missing = db.todos.exists("nonexistent").await.unwrap();
+
+        // Assert
+        assert!(found);
+        assert!(!missing);
+    }
+
+    #[tokio::test]
+    async fn todos_get_calendar_id_returns_owning_calendar() {
+        // Arrange
+        let db = setup_test_db().await;
+        let todo = test_todo("todo-1", "Test Todo");
+        let record = TodoRecord::from_todo("todo-1", &todo, "default");
+        db.todos.upsert(&record).await.unwrap();
+
+        // Act
+        let found = db.todos.get_calendar_id("todo-1").await.unwrap();
+        let missing = db.todos.get_calendar_id("nonexistent").await.unwrap();
+
+        // Assert
+        assert_eq!(found.as_deref(), Some("default"));
+        assert_eq!(missing, None);
+    }
+
+    #[tokio::test]
+    async fn todos_get_joins_assigned_short_id() {
+        // Arrange
+        let db = setup_test_db().await;
+        let todo = test_todo("todo-1", "Test Todo");
+        let record = TodoRecord::from_todo("todo-1", &todo, "default");
+        db.todos.upsert(&record).await.unwrap();
+        let before = db.todos.get("todo-1").await.unwrap().unwrap();
+        let short_id = db
+            .short_ids
+            .get_or_assign_short_id("todo-1", crate::Kind::Todo)
+            .await
+            .unwrap();
+
+        // Act
+        let after = db.todos.get("todo-1").await.unwrap().unwrap();
+
+        // Assert
+        assert_eq!(before.short_id(), None);
+        assert_eq!(after.short_id(), Some(short_id));
+    }
 }
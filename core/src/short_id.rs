@@ -58,9 +58,29 @@ impl ShortIds {
         &self,
         events: Vec<E>,
     ) -> Result<Vec<EventWithShortId<E>>, Box<dyn Error>> {
+        // Assign all missing short IDs in one transaction instead of one per event
+        let missing: Vec<String> = events
+            .iter()
+            .filter(|event| event.short_id().is_none())
+            .map(|event| event.uid().into_owned())
+            .collect();
+        let mut assigned = self
+            .db
+            .short_ids
+            .get_or_assign_short_ids(&missing, Kind::Event)
+            .await?
+            .into_iter();
+
         let mut with_id = Vec::with_capacity(events.len());
         for event in events {
-            with_id.push(self.event(event).await?);
+            let short_id = match event.short_id() {
+                Some(short_id) => short_id,
+                None => assigned.next().ok_or("missing assigned short ID")?,
+            };
+            with_id.push(EventWithShortId {
+                inner: event,
+                short_id,
+            });
         }
         Ok(with_id)
     }
@@ -86,9 +106,29 @@ impl ShortIds {
         &self,
         todos: Vec<T>,
     ) -> Result<Vec<TodoWithShortId<T>>, Box<dyn Error>> {
+        // Assign all missing short IDs in one transaction instead of one per todo
+        let missing: Vec<String> = todos
+            .iter()
+            .filter(|todo| todo.short_id().is_none())
+            .map(|todo| todo.uid().into_owned())
+            .collect();
+        let mut assigned = self
+            .db
+            .short_ids
+            .get_or_assign_short_ids(&missing, Kind::Todo)
+            .await?
+            .into_iter();
+
         let mut with_id = Vec::with_capacity(todos.len());
         for todo in todos {
-            with_id.push(self.todo(todo).await?);
+            let short_id = match todo.short_id() {
+                Some(short_id) => short_id,
+                None => assigned.next().ok_or("missing assigned short ID")?,
+            };
+            with_id.push(TodoWithShortId {
+                inner: todo,
+                short_id,
+            });
         }
         Ok(with_id)
     }
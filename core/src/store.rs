@@ -12,6 +12,7 @@ use std::error::Error;
 
 use aimcal_ical::{VEvent, VTodo};
 use async_trait::async_trait;
+use jiff::Zoned;
 
 use crate::{EventPatch, TodoPatch};
 
@@ -74,6 +75,29 @@ pub trait Store: Send + Sync {
         patch: &EventPatch,
     ) -> Result<VEvent<String>, StoreError>;
 
+    /// Updates an existing event in the store, resolving the patch against `now`.
+    ///
+    /// The default implementation ignores `now` and calls [`Store::update_event`]; stores
+    /// should override it so that one operation uses a single clock reading.
+    ///
+    /// # Arguments
+    ///
+    /// * `uid` - The unique identifier of the event to update
+    /// * `patch` - The patch to apply to the event
+    /// * `now` - The current time used to resolve the patch
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the event is not found or cannot be updated.
+    async fn update_event_at(
+        &self,
+        uid: &str,
+        patch: &EventPatch,
+        _now: &Zoned,
+    ) -> Result<VEvent<String>, StoreError> {
+        self.update_event(uid, patch).await
+    }
+
     /// Deletes an event from the store.
     ///
     /// # Arguments
@@ -120,6 +144,29 @@ pub trait Store: Send + Sync {
     /// Returns an error if the todo is not found or cannot be updated.
     async fn update_todo(&self, uid: &str, patch: &TodoPatch) -> Result<VTodo<String>, StoreError>;
 
+    /// Updates an existing todo in the store, resolving the patch against `now`.
+    ///
+    /// The default implementation ignores `now` and calls [`Store::update_todo`]; stores
+    /// should override it so that one operation uses a single clock reading.
+    ///
+    /// # Arguments
+    ///
+    /// * `uid` - The unique identifier of the todo to update
+    /// * `patch` - The patch to apply to the todo
+    /// * `now` - The current time used to resolve the patch
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the todo is not found or cannot be updated.
+    async fn update_todo_at(
+        &self,
+        uid: &str,
+        patch: &TodoPatch,
+        _now: &Zoned,
+    ) -> Result<VTodo<String>, StoreError> {
+        self.update_todo(uid, patch).await
+    }
+
     /// Deletes a todo from the store.
     ///
     /// # Arguments
@@ -4,6 +4,8 @@
 
 //! `CalDAV` store implementation for storing and synchronizing calendar data.
 
+use std::collections::HashMap;
+
 use aimcal_caldav::{CalDavClient, CalDavConfig, CalendarQueryRequest, ETag, Href};
 use aimcal_ical::{ICalendar, VEvent, VTodo, semantic::CalendarComponent};
 use async_trait::async_trait;
@@ -53,30 +55,41 @@ impl CaldavStore {
         calendar_id: String,
     ) -> Result<Self, StoreError> {
         let client = CalDavClient::new(config)?;
+        Ok(Self::with_client(client, calendar_href, db, calendar_id))
+    }
 
-        Ok(Self {
+    /// Creates a new `CalDAV` backend that shares an existing client, e.g. with other
+    /// calendars of the same store.
+    #[must_use]
+    pub fn with_client(
+        client: CalDavClient,
+        calendar_href: String,
+        db: Db,
+        calendar_id: String,
+    ) -> Self {
+        Self {
             client,
             calendar_href: Href::new(calendar_href),
             db,
             calendar_id,
-        })
+        }
     }
 
-    /// Extracts a single `VEvent` from an `ICalendar`.
-    fn extract_event(calendar: &ICalendar<String>) -> Result<VEvent<String>, StoreError> {
-        for component in &calendar.components {
+    /// Extracts a single `VEvent` from an `ICalendar`, taking ownership to avoid a copy.
+    fn extract_event(calendar: ICalendar<String>) -> Result<VEvent<String>, StoreError> {
+        for component in calendar.components {
             if let CalendarComponent::Event(event) = component {
-                return Ok(event.clone());
+                return Ok(event);
             }
         }
         Err("No VEVENT component found in calendar data".into())
     }
 
-    /// Extracts a single `VTodo` from an `ICalendar`.
-    fn extract_todo(calendar: &ICalendar<String>) -> Result<VTodo<String>, StoreError> {
-        for component in &calendar.components {
+    /// Extracts a single `VTodo` from an `ICalendar`, taking ownership to avoid a copy.
+    fn extract_todo(calendar: ICalendar<String>) -> Result<VTodo<String>, StoreError> {
+        for component in calendar.components {
             if let CalendarComponent::Todo(todo) = component {
-                return Ok(todo.clone());
+                return Ok(todo);
             }
         }
         Err("No VTODO component found in calendar data".into())
@@ -140,21 +153,27 @@ impl CaldavStore {
         }
     }
 
-    /// Gets the resource record for a UID from the database.
+    /// Loads all resource records of this calendar from the database, keyed by UID.
     ///
-    /// Unlike [`get_resource`], this returns `None` for records with missing
-    /// or invalid metadata instead of returning an error, treating them as
-    /// new resources during sync.
-    async fn get_resource_or_none(
+    /// Unlike [`get_resource`], records with missing or invalid metadata are
+    /// skipped instead of returning an error, treating them as new resources
+    /// during sync.
+    async fn load_known_resources(
         &self,
-        uid: &str,
-    ) -> Result<Option<(String, CaldavMetadata)>, StoreError> {
-        let record = self.db.resources.get(uid, &self.calendar_id).await?;
+    ) -> Result<HashMap<String, (String, CaldavMetadata)>, StoreError> {
+        let records = self
+            .db
+            .resources
+            .list_by_calendar(&self.calendar_id)
+            .await?;
 
-        match record {
-            Some(rec) => Ok(rec.metadata_json().map(|m| (rec.resource_id, m))),
-            None => Ok(None),
-        }
+        Ok(records
+            .into_iter()
+            .filter_map(|rec| {
+                let metadata = rec.metadata_json()?;
+                Some((rec.uid, (rec.resource_id, metadata)))
+            })
+            .collect())
     }
 }
 
@@ -189,7 +208,7 @@ impl Store for CaldavStore {
             .ok_or(format!("Event not found: {uid}"))?;
 
         let resource = self.client.get_event(&Href::new(href)).await?;
-        Self::extract_event(&resource.data)
+        Self::extract_event(resource.data)
     }
 
     // #[instrument]
@@ -197,6 +216,15 @@ impl Store for CaldavStore {
         &self,
         uid: &str,
         patch: &EventPatch,
+    ) -> Result<VEvent<String>, StoreError> {
+        self.update_event_at(uid, patch, &Zoned::now()).await
+    }
+
+    async fn update_event_at(
+        &self,
+        uid: &str,
+        patch: &EventPatch,
+        now: &Zoned,
     ) -> Result<VEvent<String>, StoreError> {
         let (href, metadata) = self
             .get_resource(uid)
@@ -205,11 +233,10 @@ impl Store for CaldavStore {
 
         // Fetch current event
         let resource = self.client.get_event(&Href::new(href.clone())).await?;
-        let mut event = Self::extract_event(&resource.data)?;
+        let mut event = Self::extract_event(resource.data)?;
 
         // Apply patch
-        let now = Zoned::now();
-        let resolved = patch.resolve(now);
+        let resolved = patch.resolve(now.clone());
         resolved.apply_to(&mut event);
 
         // Upload updated event
@@ -280,11 +307,20 @@ impl Store for CaldavStore {
             .ok_or(format!("Todo not found: {uid}"))?;
 
         let resource = self.client.get_todo(&Href::new(href)).await?;
-        Self::extract_todo(&resource.data)
+        Self::extract_todo(resource.data)
     }
 
     // #[instrument]
     async fn update_todo(&self, uid: &str, patch: &TodoPatch) -> Result<VTodo<String>, StoreError> {
+        self.update_todo_at(uid, patch, &Zoned::now()).await
+    }
+
+    async fn update_todo_at(
+        &self,
+        uid: &str,
+        patch: &TodoPatch,
+        now: &Zoned,
+    ) -> Result<VTodo<String>, StoreError> {
         let (href, metadata) = self
             .get_resource(uid)
             .await?
@@ -292,11 +328,10 @@ impl Store for CaldavStore {
 
         // Fetch current todo
         let resource = self.client.get_todo(&Href::new(href.clone())).await?;
-        let mut todo = Self::extract_todo(&resource.data)?;
+        let mut todo = Self::extract_todo(resource.data)?;
 
         // Apply patch
-        let now = Zoned::now();
-        let resolved = patch.resolve(&now);
+        let resolved = patch.resolve(now);
         resolved.apply_to(&mut todo);
 
         // Upload updated todo
@@ -344,13 +379,11 @@ impl Store for CaldavStore {
         let request = CalendarQueryRequest::new().component("VEVENT".to_string());
         let resources = self.client.query(&self.calendar_href, &request).await?;
 
-        let mut result = Vec::new();
+        let mut result = Vec::with_capacity(resources.len());
         for resource in resources {
-            match Self::extract_event(&resource.data) {
+            match Self::extract_event(resource.data) {
                 Ok(event) => {
-                    let _uid = event.uid.content.to_string();
-                    let href = resource.href.as_str().to_string();
-                    result.push((href.clone(), event));
+                    result.push((resource.href.as_str().to_string(), event));
 
                     // Update metadata in database
                     // TODO: Re-enable metadata updates after fixing async/await issue
@@ -382,13 +415,11 @@ impl Store for CaldavStore {
         let request = CalendarQueryRequest::new().component("VTODO".to_string());
         let resources = self.client.query(&self.calendar_href, &request).await?;
 
-        let mut result = Vec::new();
+        let mut result = Vec::with_capacity(resources.len());
         for resource in resources {
-            match Self::extract_todo(&resource.data) {
+            match Self::extract_todo(resource.data) {
                 Ok(todo) => {
-                    let _uid = todo.uid.content.to_string();
-                    let href = resource.href.as_str().to_string();
-                    result.push((href.clone(), todo));
+                    result.push((resource.href.as_str().to_string(), todo));
 
                     // Update metadata in database
                     // TODO: Re-enable metadata updates after fixing async/await issue
@@ -427,30 +458,40 @@ impl Store for CaldavStore {
 
     // #[instrument]
     async fn sync_cache(&self) -> Result<SyncResult, StoreError> {
-        // Ensure capabilities are discovered before querying
-        self.client.discover().await?;
+        // Ensure capabilities are discovered before querying; they are cached on
+        // the client, so repeated syncs skip the OPTIONS/PROPFIND round trips.
+        if !self.client.capabilities().supports_calendars {
+            self.client.discover().await?;
+        }
 
         let mut created = 0;
         let mut updated = 0;
         let deleted = 0;
 
-        // Query all VEVENT resources
+        // Load the cached resources once instead of querying per item
+        let known = self.load_known_resources().await?;
+
+        // Query all VEVENT and VTODO resources; the requests are independent, so
+        // run them concurrently to pay one round trip instead of two
         let event_request = CalendarQueryRequest::new().component("VEVENT".to_string());
-        let event_resources = self
-            .client
-            .query(&self.calendar_href, &event_request)
-            .await?;
+        let todo_request = CalendarQueryRequest::new().component("VTODO".to_string());
+        let (event_resources, todo_resources) = tokio::try_join!(
+            self.client.query(&self.calendar_href, &event_request),
+            self.client.query(&self.calendar_href, &todo_request),
+        )?;
+
+        // Write all resource updates in one transaction: one commit per sync
+        // instead of one per resource
+        let mut tx = self.db.begin().await?;
 
         for resource in event_resources {
-            if let Ok(event) = Self::extract_event(&resource.data) {
+            if let Ok(event) = Self::extract_event(resource.data) {
                 let uid = event.uid.content.to_string();
                 let href = resource.href.as_str().to_string();
                 let etag_str = Self::etag_to_string(&resource.etag);
 
-                if let Some((existing_href, existing_metadata)) =
-                    self.get_resource_or_none(&uid).await?
-                {
-                    if existing_href == href {
+                if let Some((existing_href, existing_metadata)) = known.get(&uid) {
+                    if *existing_href == href {
                         // Same resource - check if ETag changed
                         if existing_metadata.etag != etag_str {
                             // Resource was updated on server
@@ -459,10 +500,13 @@ impl Store for CaldavStore {
                                 last_modified: None,
                             };
                             let metadata_json = serde_json::to_string(&metadata)?;
-                            self.db
-                                .resources
-                                .insert(&uid, &self.calendar_id, &href, Some(&metadata_json))
-                                .await?;
+                            tx.insert_resource(
+                                &uid,
+                                &self.calendar_id,
+                                &href,
+                                Some(&metadata_json),
+                            )
+                            .await?;
                             updated += 1;
                         }
                     } else {
@@ -473,9 +517,7 @@ impl Store for CaldavStore {
                             last_modified: None,
                         };
                         let metadata_json = serde_json::to_string(&metadata)?;
-                        self.db
-                            .resources
-                            .insert(&uid, &self.calendar_id, &href, Some(&metadata_json))
+                        tx.insert_resource(&uid, &self.calendar_id, &href, Some(&metadata_json))
                             .await?;
                         created += 1;
                     }
@@ -486,32 +528,21 @@ impl Store for CaldavStore {
                         last_modified: None,
                     };
                     let metadata_json = serde_json::to_string(&metadata)?;
-                    self.db
-                        .resources
-                        .insert(&uid, &self.calendar_id, &href, Some(&metadata_json))
+                    tx.insert_resource(&uid, &self.calendar_id, &href, Some(&metadata_json))
                         .await?;
                     created += 1;
                 }
             }
         }
 
-        // Query all VTODO resources
-        let todo_request = CalendarQueryRequest::new().component("VTODO".to_string());
-        let todo_resources = self
-            .client
-            .query(&self.calendar_href, &todo_request)
-            .await?;
-
         for resource in todo_resources {
-            if let Ok(todo) = Self::extract_todo(&resource.data) {
+            if let Ok(todo) = Self::extract_todo(resource.data) {
                 let uid = todo.uid.content.to_string();
                 let href = resource.href.as_str().to_string();
                 let etag_str = Self::etag_to_string(&resource.etag);
 
-                if let Some((existing_href, existing_metadata)) =
-                    self.get_resource_or_none(&uid).await?
-                {
-                    if existing_href == href {
+                if let Some((existing_href, existing_metadata)) = known.get(&uid) {
+                    if *existing_href == href {
                         // Same resource - check if ETag changed
                         if existing_metadata.etag != etag_str {
                             // Resource was updated on server
@@ -520,10 +551,13 @@ impl Store for CaldavStore {
                                 last_modified: None,
                             };
                             let metadata_json = serde_json::to_string(&metadata)?;
-                            self.db
-                                .resources
-                                .insert(&uid, &self.calendar_id, &href, Some(&metadata_json))
-                                .await?;
+                            tx.insert_resource(
+                                &uid,
+                                &self.calendar_id,
+                                &href,
+                                Some(&metadata_json),
+                            )
+                            .await?;
                             updated += 1;
                         }
                     } else {
@@ -533,9 +567,7 @@ impl Store for CaldavStore {
                             last_modified: None,
                         };
                         let metadata_json = serde_json::to_string(&metadata)?;
-                        self.db
-                            .resources
-                            .insert(&uid, &self.calendar_id, &href, Some(&metadata_json))
+                        tx.insert_resource(&uid, &self.calendar_id, &href, Some(&metadata_json))
                             .await?;
                         created += 1;
                     }
@@ -546,15 +578,15 @@ impl Store for CaldavStore {
                         last_modified: None,
                     };
                     let metadata_json = serde_json::to_string(&metadata)?;
-                    self.db
-                        .resources
-                        .insert(&uid, &self.calendar_id, &href, Some(&metadata_json))
+                    tx.insert_resource(&uid, &self.calendar_id, &href, Some(&metadata_json))
                         .await?;
                     created += 1;
                 }
             }
         }
 
+        tx.commit().await?;
+
         // Note: We don't handle deletions here because we'd need to track
         // all known UIDs and compare with what's on the server.
         // This is a more complex operation that may be added later.
@@ -677,7 +709,7 @@ mod tests {
         let event = test_vevent();
         let calendar = CaldavStore::wrap_event(&event);
 
-        let extracted = CaldavStore::extract_event(&calendar).unwrap();
+        let extracted = CaldavStore::extract_event(calendar).unwrap();
         assert_eq!(extracted.uid.content.to_string(), "test-event-uid");
         assert_eq!(
             extracted.summary.as_ref().unwrap().content.to_string(),
@@ -697,7 +729,7 @@ mod tests {
             retained_properties: Vec::new(),
         };
 
-        assert!(CaldavStore::extract_event(&calendar).is_err());
+        assert!(CaldavStore::extract_event(calendar).is_err());
     }
 
     #[test]
@@ -705,7 +737,7 @@ mod tests {
         let todo = test_vtodo();
         let calendar = CaldavStore::wrap_todo(&todo);
 
-        let extracted = CaldavStore::extract_todo(&calendar).unwrap();
+        let extracted = CaldavStore::extract_todo(calendar).unwrap();
         assert_eq!(extracted.uid.content.to_string(), "test-todo-uid");
         assert_eq!(
             extracted.summary.as_ref().unwrap().content.to_string(),
@@ -725,7 +757,7 @@ mod tests {
             retained_properties: Vec::new(),
         };
 
-        assert!(CaldavStore::extract_todo(&calendar).is_err());
+        assert!(CaldavStore::extract_todo(calendar).is_err());
     }
 
     #[test]
@@ -852,7 +884,7 @@ mod tests {
     async fn backend_caldav_extract_event_from_calendar() {
         let calendar = CaldavStore::wrap_event(&test_vevent());
 
-        let extracted = CaldavStore::extract_event(&calendar).expect("Failed to extract event");
+        let extracted = CaldavStore::extract_event(calendar).expect("Failed to extract event");
 
         assert_eq!(extracted.uid.content.to_string(), "test-event-uid");
         assert_eq!(
@@ -865,7 +897,7 @@ mod tests {
     async fn backend_caldav_extract_todo_from_calendar() {
         let calendar = CaldavStore::wrap_todo(&test_vtodo());
 
-        let extracted = CaldavStore::extract_todo(&calendar).expect("Failed to extract todo");
+        let extracted = CaldavStore::extract_todo(calendar).expect("Failed to extract todo");
 
         assert_eq!(extracted.uid.content.to_string(), "test-todo-uid");
         assert_eq!(
@@ -1205,4 +1237,65 @@ END:VCALENDAR\r\n";
         assert!(error_msg.contains("Precondition failed"));
         assert!(error_msg.contains("ETag mismatch"));
     }
+
+    #[tokio::test]
+    async fn backend_caldav_sync_cache_discovers_capabilities_once() {
+        let mock_server = MockServer::start().await;
+        let empty_multistatus = r#"<?xml version="1.0" encoding="utf-8" ?>
+<D:multistatus xmlns:D="DAV:"></D:multistatus>"#;
+
+        // Discovery must only run on the first sync
+        Mock::given(method("OPTIONS"))
+            .and(path("/dav/calendars/"))
+            .respond_with(ResponseTemplate::new(200).insert_header("DAV", "1, 2, calendar-access"))
+            .expect(1)
+            .mount(&mock_server)
+            .await;
+
+        Mock::given(method("PROPFIND"))
+            .and(path("/dav/calendars/"))
+            .respond_with(
+                ResponseTemplate::new(207).set_body_raw(empty_multistatus, "application/xml"),
+            )
+            .expect(1)
+            .mount(&mock_server)
+            .await;
+
+        // Both syncs query events and todos
+        Mock::given(method("REPORT"))
+            .and(path("/dav/calendars/default/"))
+            .respond_with(
+                ResponseTemplate::new(207).set_body_raw(empty_multistatus, "application/xml"),
+            )
+            .expect(4)
+            .mount(&mock_server)
+            .await;
+
+        let config = CalDavConfig {
+            base_url: mock_server.uri(),
+            calendar_home: "/dav/calendars/".to_string(),
+            auth: aimcal_caldav::AuthMethod::None,
+            ..Default::default()
+        };
+
+        let db = Db::open(None)
+            .await
+            .expect("Failed to create test database");
+
+        let backend = CaldavStore::new(
+            config,
+            "/dav/calendars/default/".to_string(),
+            db,
+            "default".to_string(),
+        )
+        .expect("Failed to create CaldavStore");
+
+        backend.sync_cache().await.expect("Failed to sync cache");
+        backend
+            .sync_cache()
+            .await
+            .expect("Failed to sync cache again");
+
+        mock_server.verify().await;
+    }
 }
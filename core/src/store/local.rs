@@ -18,6 +18,19 @@ use crate::db::Db;
 use crate::store::{StoreError, SyncResult};
 use crate::{Event, EventPatch, LooseDateTime, Todo, TodoPatch};
 
+/// Returns the UID of an event or todo component.
+fn component_uid(component: &CalendarComponent<String>) -> Option<String> {
+    match component {
+        CalendarComponent::Event(event) => Some(event.uid.content.to_string()),
+        CalendarComponent::Todo(todo) => Some(todo.uid.content.to_string()),
+        _ => None,
+    }
+}
+
+/// Maximum number of parsed items written per transaction when syncing from disk, bounding
+/// how long the write lock is held and how much a failed commit discards.
+const SYNC_BATCH_SIZE: usize = 100;
+
 /// Convert `Box<dyn Error>` (non-Send+Sync) to `StoreError` by wrapping in a String.
 ///
 /// Use this for errors from parsing or database operations that return `Box<dyn Error>`.
@@ -166,23 +179,75 @@ impl LocalStore {
             .await
             .map_err(|e| StoreError::from(format!("Failed to list resources: {e}")))?;
 
-        let mut deleted = 0;
-        for uid in &db_uids {
-            if !disk_uids.contains(uid) {
-                if let Err(e) = db.events.delete(uid).await {
-                    tracing::warn!(uid = %uid, err = %e, "failed to delete stale event");
-                }
-                if let Err(e) = db.todos.delete(uid).await {
-                    tracing::warn!(uid = %uid, err = %e, "failed to delete stale todo");
+        let stale: Vec<&str> = db_uids
+            .iter()
+            .map(String::as_str)
+            .filter(|uid| !disk_uids.contains(*uid))
+            .collect();
+        if stale.is_empty() {
+            return Ok(0);
+        }
+
+        // Delete all stale entries with batched statements in one transaction
+        // instead of three autocommitted statements per UID. A failure is logged
+        // and does not abort the sync; the entries are retried on the next sync.
+        let result: Result<(), sqlx::Error> = async {
+            let mut tx = db.begin().await?;
+            tx.delete_items(&stale, &self.calendar_id).await?;
+            tx.commit().await
+        }
+        .await;
+        if let Err(e) = result {
+            tracing::warn!(count = stale.len(), err = %e, "failed to delete stale entries");
+            return Ok(0);
+        }
+
+        Ok(stale.len())
+    }
+
+    /// Writes a batch of parsed components in one transaction and returns the UIDs written.
+    ///
+    /// Components that fail to write are logged and skipped; the batch fails as a whole
+    /// only if the transaction cannot be opened or committed.
+    async fn write_batch(
+        &self,
+        db: &Db,
+        batch: &[(PathBuf, CalendarComponent<String>)],
+    ) -> Result<Vec<String>, sqlx::Error> {
+        let mut tx = db.begin().await?;
+        let mut uids = Vec::with_capacity(batch.len());
+        for (path, component) in batch {
+            let uid = match component {
+                CalendarComponent::Event(event) => {
+                    let uid = event.uid.content.to_string();
+                    if let Err(e) = tx.upsert_event(&uid, event, &self.calendar_id).await {
+                        tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to upsert event");
+                        continue;
+                    }
+                    uid
                 }
-                if let Err(e) = db.resources.delete(uid, &self.calendar_id).await {
-                    tracing::warn!(uid = %uid, err = %e, "failed to delete stale resource");
+                CalendarComponent::Todo(todo) => {
+                    let uid = todo.uid.content.to_string();
+                    if let Err(e) = tx.upsert_todo(&uid, todo, &self.calendar_id).await {
+                        tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to upsert todo");
+                        continue;
+                    }
+                    uid
                 }
-                deleted += 1;
+                _ => continue,
+            };
+
+            if let Err(e) = tx
+                .insert_resource(&uid, &self.calendar_id, &self.resource_id(&uid), None)
+                .await
+            {
+                tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to insert resource");
+                continue;
             }
+            uids.push(uid);
         }
-
-        Ok(deleted)
+        tx.commit().await?;
+        Ok(uids)
     }
 
     /// Scans the calendar directory for .ics files and syncs with the database.
@@ -210,6 +275,8 @@ impl LocalStore {
             }
         };
 
+        // Parse all files first so that no transaction stays open across file reads
+        let mut components = Vec::new();
         while let Some(entry) = entries.next_entry().await? {
             let path = entry.path();
             match path.extension() {
@@ -223,47 +290,10 @@ impl LocalStore {
                         }
                     };
 
-                    // Process each component in the calendar
                     for component in calendar.components {
                         match component {
-                            CalendarComponent::Event(event) => {
-                                let uid = event.uid.content.to_string();
-
-                                if let Err(e) =
-                                    db.upsert_event(&uid, &event, &self.calendar_id).await
-                                {
-                                    tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to upsert event");
-                                    continue;
-                                }
-                                if let Err(e) = db
-                                    .resources
-                                    .insert(&uid, &self.calendar_id, &self.resource_id(&uid), None)
-                                    .await
-                                {
-                                    tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to insert resource");
-                                    continue;
-                                }
-                                disk_uids.insert(uid);
-                                created += 1;
-                            }
-                            CalendarComponent::Todo(todo) => {
-                                let uid = todo.uid.content.to_string();
-
-                                if let Err(e) = db.upsert_todo(&uid, &todo, &self.calendar_id).await
-                                {
-                                    tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to upsert todo");
-                                    continue;
-                                }
-                                if let Err(e) = db
-                                    .resources
-                                    .insert(&uid, &self.calendar_id, &self.resource_id(&uid), None)
-                                    .await
-                                {
-                                    tracing::error!(path = %path.display(), uid = %uid, err = %e, "failed to insert resource");
-                                    continue;
-                                }
-                                disk_uids.insert(uid);
-                                created += 1;
+                            CalendarComponent::Event(_) | CalendarComponent::Todo(_) => {
+                                components.push((path.clone(), component));
                             }
                             _ => {
                                 tracing::warn!(
@@ -278,6 +308,22 @@ impl LocalStore {
             }
         }
 
+        // Write in bounded batches: one commit (and fsync) per batch instead of one
+        // per statement, while a failed commit only loses its own batch
+        for batch in components.chunks(SYNC_BATCH_SIZE) {
+            match self.write_batch(db, batch).await {
+                Ok(uids) => {
+                    created += uids.len();
+                    disk_uids.extend(uids);
+                }
+                Err(e) => {
+                    tracing::error!(count = batch.len(), err = %e, "failed to write sync batch");
+                    // The files still exist, so keep their cached rows out of stale removal
+                    disk_uids.extend(batch.iter().filter_map(|(_, c)| component_uid(c)));
+                }
+            }
+        }
+
         // Remove stale DB entries whose files no longer exist on disk.
         // TODO: should we use db or store as golden source here? If we use db as golden source, we
         // might end up deleting files that were just created on disk but haven't been synced yet.
@@ -334,8 +380,15 @@ impl crate::store::Store for LocalStore {
         uid: &str,
         patch: &EventPatch,
     ) -> Result<aimcal_ical::VEvent<String>, StoreError> {
-        let now = Zoned::now();
+        self.update_event_at(uid, patch, &Zoned::now()).await
+    }
 
+    async fn update_event_at(
+        &self,
+        uid: &str,
+        patch: &EventPatch,
+        now: &Zoned,
+    ) -> Result<aimcal_ical::VEvent<String>, StoreError> {
         // Try to get existing event from file
         match self.get_event(uid).await {
             Ok(mut event) => {
@@ -343,17 +396,16 @@ impl crate::store::Store for LocalStore {
                 patch.resolve(now.clone()).apply_to(&mut event);
 
                 let file_path = self.file_path(uid);
-                let calendar = ICalendar {
-                    components: vec![CalendarComponent::Event(event.clone())],
-                    ..Default::default()
-                };
-                write_ics(&file_path, &calendar).await?;
+                let event = write_event(&file_path, event).await?;
 
                 Ok(event)
             }
-            Err(_) if self.db.is_some() => {
-                // Case 2/3: File doesn't exist but we have DB - reconstruct from DB
-                let db = self.db.as_ref().unwrap();
+            Err(e) => {
+                // Case 2/3: File doesn't exist - reconstruct from DB if we have one
+                let Some(db) = &self.db else {
+                    return Err(e);
+                };
+
                 let db_event = db
                     .events
                     .get(uid)
@@ -361,29 +413,30 @@ impl crate::store::Store for LocalStore {
                     .map_err(|e| StoreError::from(format!("{e}")))?
                     .ok_or_else(|| StoreError::from("Event not found in database"))?;
 
-                let mut event = reconstruct_event_from_db(&db_event, &now);
+                let mut event = reconstruct_event_from_db(&db_event, now);
                 patch.resolve(now.clone()).apply_to(&mut event);
 
                 // Write to file
                 let file_path = self.file_path(uid);
-                let calendar = ICalendar {
-                    components: vec![CalendarComponent::Event(event.clone())],
-                    ..Default::default()
-                };
-                write_ics(&file_path, &calendar).await?;
+                let event = write_event(&file_path, event).await?;
 
-                // Update resource record and database
-                db.resources
-                    .insert(uid, &self.calendar_id, &self.resource_id(uid), None)
+                // Update resource record and database in one transaction
+                let mut tx = db
+                    .begin()
+                    .await
+                    .map_err(|e| StoreError::from(format!("{e}")))?;
+                tx.insert_resource(uid, &self.calendar_id, &self.resource_id(uid), None)
                     .await
                     .map_err(|e| StoreError::from(format!("{e}")))?;
-                db.upsert_event(uid, &event, &self.calendar_id)
+                tx.upsert_event(uid, &event, &self.calendar_id)
+                    .await
+                    .map_err(|e| StoreError::from(format!("{e}")))?;
+                tx.commit()
                     .await
                     .map_err(|e| StoreError::from(format!("{e}")))?;
 
                 Ok(event)
             }
-            Err(e) => Err(e),
         }
     }
 
@@ -433,26 +486,32 @@ impl crate::store::Store for LocalStore {
         uid: &str,
         patch: &TodoPatch,
     ) -> Result<aimcal_ical::VTodo<String>, StoreError> {
-        let now = Zoned::now();
+        self.update_todo_at(uid, patch, &Zoned::now()).await
+    }
 
+    async fn update_todo_at(
+        &self,
+        uid: &str,
+        patch: &TodoPatch,
+        now: &Zoned,
+    ) -> Result<aimcal_ical::VTodo<String>, StoreError> {
         // Try to get existing todo from file
         match self.get_todo(uid).await {
             Ok(mut todo) => {
                 // File exists: apply patch and write back
-                patch.resolve(&now).apply_to(&mut todo);
+                patch.resolve(now).apply_to(&mut todo);
 
                 let file_path = self.file_path(uid);
-                let calendar = ICalendar {
-                    components: vec![CalendarComponent::Todo(todo.clone())],
-                    ..Default::default()
-                };
-                write_ics(&file_path, &calendar).await?;
+                let todo = write_todo(&file_path, todo).await?;
 
                 Ok(todo)
             }
-            Err(_) if self.db.is_some() => {
-                // File doesn't exist but we have DB: reconstruct from DB
-                let db = self.db.as_ref().unwrap();
+            Err(e) => {
+                // File doesn't exist: reconstruct from DB if we have one
+                let Some(db) = &self.db else {
+                    return Err(e);
+                };
+
                 let db_todo = db
                     .todos
                     .get(uid)
@@ -460,29 +519,30 @@ impl crate::store::Store for LocalStore {
                     .map_err(|e| StoreError::from(format!("{e}")))?
                     .ok_or_else(|| StoreError::from("Todo not found in database"))?;
 
-                let mut todo = reconstruct_todo_from_db(&db_todo, &now);
-                patch.resolve(&now).apply_to(&mut todo);
+                let mut todo = reconstruct_todo_from_db(&db_todo, now);
+                patch.resolve(now).apply_to(&mut todo);
 
                 // Write to file
                 let file_path = self.file_path(uid);
-                let calendar = ICalendar {
-                    components: vec![CalendarComponent::Todo(todo.clone())],
-                    ..Default::default()
-                };
-                write_ics(&file_path, &calendar).await?;
+                let todo = write_todo(&file_path, todo).await?;
 
-                // Update resource record and database
-                db.resources
-                    .insert(uid, &self.calendar_id, &self.resource_id(uid), None)
+                // Update resource record and database in one transaction
+                let mut tx = db
+                    .begin()
                     .await
                     .map_err(|e| StoreError::from(format!("{e}")))?;
-                db.upsert_todo(uid, &todo, &self.calendar_id)
+                tx.insert_resource(uid, &self.calendar_id, &self.resource_id(uid), None)
+                    .await
+                    .map_err(|e| StoreError::from(format!("{e}")))?;
+                tx.upsert_todo(uid, &todo, &self.calendar_id)
+                    .await
+                    .map_err(|e| StoreError::from(format!("{e}")))?;
+                tx.commit()
                     .await
                     .map_err(|e| StoreError::from(format!("{e}")))?;
 
                 Ok(todo)
             }
-            Err(e) => Err(e),
         }
     }
 
@@ -631,6 +691,40 @@ pub async fn write_ics(path: &Path, calendar: &ICalendar<String>) -> Result<(),
         .map_err(|e| format!("Failed to write calendar file: {e}"))
 }
 
+/// Writes a single event to `path` and hands it back, avoiding a deep copy.
+async fn write_event(
+    path: &Path,
+    event: aimcal_ical::VEvent<String>,
+) -> Result<aimcal_ical::VEvent<String>, String> {
+    let calendar = ICalendar {
+        components: vec![CalendarComponent::Event(event)],
+        ..Default::default()
+    };
+    write_ics(path, &calendar).await?;
+
+    match calendar.components.into_iter().next() {
+        Some(CalendarComponent::Event(event)) => Ok(event),
+        _ => unreachable!("calendar was built with a single event"),
+    }
+}
+
+/// Writes a single todo to `path` and hands it back, avoiding a deep copy.
+async fn write_todo(
+    path: &Path,
+    todo: aimcal_ical::VTodo<String>,
+) -> Result<aimcal_ical::VTodo<String>, String> {
+    let calendar = ICalendar {
+        components: vec![CalendarComponent::Todo(todo)],
+        ..Default::default()
+    };
+    write_ics(path, &calendar).await?;
+
+    match calendar.components.into_iter().next() {
+        Some(CalendarComponent::Todo(todo)) => Ok(todo),
+        _ => unreachable!("calendar was built with a single todo"),
+    }
+}
+
 #[cfg(test)]
 mod tests {
     use aimcal_ical::{DtEnd, DtStamp, DtStart, Summary, Uid};
@@ -1054,4 +1148,51 @@ mod tests {
         assert!(events.is_empty());
         assert!(todos.is_empty());
     }
+
+    #[tokio::test]
+    async fn local_backend_sync_keeps_cached_rows_when_batch_fails() {
+        // Arrange
+        let temp_dir = tempfile::tempdir().expect("Failed to create temp dir");
+        let db = Db::open(None).await.unwrap();
+        let backend = LocalStore::with_db(
+            temp_dir.path().to_path_buf(),
+            db.clone(),
+            "default".to_string(),
+        );
+        let event = create_test_vevent("event-1", "Event 1");
+        backend.create_event("event-1", &event).await.unwrap();
+        backend.sync_cache().await.unwrap();
+
+        // Make the next write of event-1 violate a deferred foreign key, so the batch
+        // fails at COMMIT
+        sqlx::raw_sql(
+            "\
+UPDATE events SET summary = 'Outdated' WHERE uid = 'event-1';
+CREATE TABLE guard_parent (id INTEGER PRIMARY KEY);
+CREATE TABLE guard (parent INTEGER REFERENCES guard_parent(id) DEFERRABLE INITIALLY DEFERRED);
+CREATE TRIGGER guard_events AFTER UPDATE ON events
+BEGIN
+    INSERT INTO guard (parent) VALUES (1);
+END;
+",
+        )
+        .execute(db.pool())
+        .await
+        .unwrap();
+
+        // Act
+        let result = backend.sync_cache().await.unwrap();
+
+        // Assert
+        assert_eq!(result.deleted, 0);
+        let cached = db.events.get("event-1").await.unwrap().unwrap();
+        assert_eq!(cached.summary(), "Outdated");
+        assert!(
+            db.resources
+                .get("event-1", "default")
+                .await
+                .unwrap()
+                .is_some()
+        );
+    }
 }
@@ -35,43 +35,52 @@ impl<T: AsRef<[EventOccurrence<String>]>> ConflictExt for T {
             return Vec::new();
         }
 
-        let mut conflicts = Vec::new();
+        // Sweep in start order: once a later event starts at or after the current
+        // event's end, no further events can overlap it, so only overlapping
+        // pairs are visited instead of all O(n^2) pairs.
+        let mut sorted = valid_events;
+        sorted.sort_unstable_by_key(|(idx, occ)| (occ.start, *idx));
+
+        let mut pairs = Vec::new();
+        for (i, (idx1, occ1)) in sorted.iter().enumerate() {
+            // SAFETY: We filtered for events with end times
+            let end1 = occ1.end.unwrap();
+
+            for (idx2, occ2) in sorted.iter().skip(i + 1) {
+                if occ2.start >= end1 {
+                    break;
+                }
 
-        // Compare all pairs using iterators
-        for (i, (idx1, occ1)) in valid_events.iter().enumerate() {
-            for (idx2, occ2) in valid_events.iter().skip(i + 1) {
-                // SAFETY: We filtered for events with end times
-                let end1 = occ1.end.unwrap();
+                // occ2 starts in [occ1.start, end1), so they overlap iff occ1.start < end2
                 let end2 = occ2.end.unwrap();
-
-                // Check overlap: occ1.start < occ2.end AND occ2.start < occ1.end
-                if occ1.start < end2 && occ2.start < end1 {
-                    let overlap_start = std::cmp::max(occ1.start, occ2.start);
-                    let overlap_end = std::cmp::min(end1, end2);
-
-                    conflicts.push(Conflict {
-                        events: vec![
-                            ConflictEvent {
-                                index: *idx1,
-                                overlap: ConflictRange {
-                                    start: overlap_start,
-                                    end: overlap_end,
-                                },
-                            },
-                            ConflictEvent {
-                                index: *idx2,
-                                overlap: ConflictRange {
-                                    start: overlap_start,
-                                    end: overlap_end,
-                                },
-                            },
-                        ],
-                    });
+                if occ1.start < end2 {
+                    let overlap = ConflictRange {
+                        start: std::cmp::max(occ1.start, occ2.start),
+                        end: std::cmp::min(end1, end2),
+                    };
+                    pairs.push(((*idx1).min(*idx2), (*idx1).max(*idx2), overlap));
                 }
             }
         }
 
-        conflicts
+        // Report conflicts in input order, as a pairwise scan would
+        pairs.sort_unstable_by_key(|(idx1, idx2, _)| (*idx1, *idx2));
+
+        pairs
+            .into_iter()
+            .map(|(idx1, idx2, overlap)| Conflict {
+                events: vec![
+                    ConflictEvent {
+                        index: idx1,
+                        overlap,
+                    },
+                    ConflictEvent {
+                        index: idx2,
+                        overlap,
+                    },
+                ],
+            })
+            .collect()
     }
 }
 
@@ -336,4 +345,34 @@ END:VCALENDAR\r\n\
         assert_eq!(overlap.start, "2025-01-01T11:00".parse().unwrap());
         assert_eq!(overlap.end, "2025-01-01T11:30".parse().unwrap());
     }
+
+    #[test]
+    fn reports_conflicts_in_input_order_for_unsorted_events() {
+        let event1 = make_minimal_event("1");
+        let event2 = make_minimal_event("2");
+        let event3 = make_minimal_event("3");
+
+        // Input is not sorted by start; event 0 overlaps both others
+        let occurrences = vec![
+            make_occurrence_from_event(event1, "2025-01-01T11:00", Some("2025-01-01T13:00")),
+            make_occurrence_from_event(event2, "2025-01-01T12:00", Some("2025-01-01T14:00")),
+            make_occurrence_from_event(event3, "2025-01-01T09:00", Some("2025-01-01T11:30")),
+        ];
+
+        let conflicts = occurrences.detect_conflicts();
+
+        let pairs: Vec<(usize, usize)> = conflicts
+            .iter()
+            .map(|c| {
+                let first = c.events.first().unwrap();
+                let second = c.events.get(1).unwrap();
+                (first.index, second.index)
+            })
+            .collect();
+        assert_eq!(pairs, vec![(0, 1), (0, 2)]);
+
+        let overlap = conflicts.get(1).unwrap().events.first().unwrap().overlap;
+        assert_eq!(overlap.start, "2025-01-01T11:00".parse().unwrap());
+        assert_eq!(overlap.end, "2025-01-01T11:30".parse().unwrap());
+    }
 }